@@ -1,7 +1,20 @@
-from flask import Flask
+import os
+from flask import Flask, jsonify, request
 from Conexion.conexion import obtener_conexion
+from acceso_datos import PoolConexiones, UsuariosDAO
+from instrumentacion import Instrumentacion
 
 app = Flask(__name__)
+instrumentacion = Instrumentacion(app)
+obtener_conexion = instrumentacion.envolver_conexion(obtener_conexion)
+
+# Conexiones reutilizadas entre peticiones (una por hilo como máximo hasta el tamaño del pool)
+pool = PoolConexiones(obtener_conexion, tamano=int(os.environ.get("DB_POOL_TAMANO", 5)))
+usuarios_dao = UsuariosDAO(pool)
+MAX_LOTE = 10000
+# Cota en bytes del cuerpo (~1 KB por usuario): Flask responde 413 antes de
+# leer y parsear un JSON enorme, que MAX_LOTE solo podría rechazar después
+app.config["MAX_CONTENT_LENGTH"] = MAX_LOTE * 1024
 
 @app.route('/')
 def home():
@@ -10,32 +23,39 @@ def home():
 @app.route('/test_db')
 def test_db():
     try:
-        conexion = obtener_conexion()
-        cursor = conexion.cursor()
-        cursor.execute("SELECT DATABASE();")
-        resultado = cursor.fetchone()
-        return f"Conectado a la base de datos: {resultado[0]}"
+        return f"Conectado a la base de datos: {usuarios_dao.base_de_datos()}"
     except Exception as e:
         return f"Error en la conexión: {e}"
 
 @app.route('/insertar_usuario')
 def insertar_usuario():
-    conexion = obtener_conexion()
-    cursor = conexion.cursor()
-    cursor.execute(
-        "INSERT INTO usuarios(nombre, mail) VALUES (%s, %s)",
-        ("Juan Pérez", "juan@example.com")
-    )
-    conexion.commit()
+    usuarios_dao.insertar("Juan Pérez", "juan@example.com")
     return "Usuario insertado correctamente ✅"
 
+@app.route('/usuarios/lote', methods=['POST'])
+def insertar_usuarios_lote():
+    # Espera una lista JSON: [{"nombre": "...", "mail": "..."}, ...]
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, list):
+        return jsonify(error="Se esperaba una lista JSON de usuarios."), 400
+    if len(datos) > MAX_LOTE:
+        return jsonify(error=f"Máximo {MAX_LOTE} usuarios por lote."), 413
+    filas = []
+    for u in datos:
+        nombre = u.get("nombre") if isinstance(u, dict) else None
+        mail = u.get("mail") if isinstance(u, dict) else None
+        # Sin str(): null se guardaría como "None" y se aceptarían números u objetos
+        if not (isinstance(nombre, str) and nombre.strip() and isinstance(mail, str) and mail.strip()):
+            return jsonify(error="Cada usuario necesita 'nombre' y 'mail' como texto no vacío."), 400
+        filas.append((nombre, mail))
+    return jsonify(insertados=usuarios_dao.insertar_lote(filas)), 201
+
 @app.route('/usuarios')
 def listar_usuarios():
-    conexion = obtener_conexion()
-    cursor = conexion.cursor()
-    cursor.execute("SELECT * FROM usuarios")
-    usuarios = cursor.fetchall()
-    return str(usuarios)
+    despues_de = request.args.get('despues_de', 0, type=int)
+    limite = request.args.get('limite', 50, type=int)
+    usuarios, siguiente = usuarios_dao.listar(despues_de, limite)
+    return jsonify(usuarios=usuarios, siguiente=siguiente)
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -3,9 +3,17 @@ from flask_login import LoginManager, login_user, login_required, logout_user, U
 from werkzeug.security import generate_password_hash, check_password_hash
 import conexion.conexion as db
 import models
+from estaticos import Estaticos
+from instrumentacion import Instrumentacion
+from plantillas import PrecargaPlantillas
 
 app = Flask(__name__)
 app.secret_key = "clave_secreta"
+instrumentacion = Instrumentacion(app)
+Estaticos(app)
+PrecargaPlantillas(app)
+# models usa db.get_connection: se envuelve en el módulo para medir sus consultas
+db.get_connection = instrumentacion.envolver_conexion(db.get_connection)
 
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -1,8 +1,17 @@
 from flask import Flask, render_template, request, redirect, url_for, session, flash
 from config import get_db_connection
+# instrumentacion, estaticos y plantillas están en la raíz del repositorio:
+# arrancar con `python servidor.py 16/2.py --modo dev`
+from estaticos import Estaticos
+from instrumentacion import Instrumentacion
+from plantillas import PrecargaPlantillas
 
 app = Flask(__name__)
 app.secret_key = "clave_secreta"
+instrumentacion = Instrumentacion(app)
+Estaticos(app)
+PrecargaPlantillas(app)
+get_db_connection = instrumentacion.envolver_conexion(get_db_connection)
 
 # Ruta principal
 @app.route("/")
@@ -0,0 +1,173 @@
+"""
+Capa de acceso a datos para la app de ,,,.py (tabla `usuarios`).
+
+- PoolConexiones: reutiliza un número acotado de conexiones creadas con
+  cualquier función tipo `obtener_conexion()`; se usan con `with` y siempre
+  vuelven al pool sin transacción abierta (o se descartan si quedaron rotas).
+  Antes de prestar una conexión libre se comprueba que siga viva (el servidor
+  pudo cerrarla por wait_timeout o un reinicio) y, si no, se abre otra.
+- UsuariosDAO: consultas de la tabla usuarios con paginación por clave
+  (sin OFFSET) leída con un cursor no bufferizado, e inserción por lotes.
+
+Uso:
+    pool = PoolConexiones(obtener_conexion, tamano=5)
+    usuarios = UsuariosDAO(pool)
+    pagina, siguiente = usuarios.listar(despues_de=0, limite=50)
+"""
+from __future__ import annotations
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class PoolAgotado(RuntimeError):
+    """No quedó ninguna conexión libre dentro del tiempo de espera."""
+
+
+class PoolConexiones:
+    def __init__(self, fabrica: Callable, tamano: int = 5, espera: float = 10.0) -> None:
+        if tamano < 1:
+            raise ValueError("El tamaño del pool debe ser al menos 1.")
+        self._fabrica = fabrica
+        self._espera = espera
+        self._libres: "queue.LifoQueue" = queue.LifoQueue()
+        # Un permiso por conexión: acota las conexiones abiertas a `tamano`
+        self._permisos = threading.BoundedSemaphore(tamano)
+
+    def _adquirir(self):
+        if not self._permisos.acquire(timeout=self._espera):
+            raise PoolAgotado(f"Sin conexiones libres tras {self._espera} s.")
+        while True:
+            try:
+                conexion = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            if self._sigue_viva(conexion):
+                return conexion
+            try:
+                conexion.close()
+            except Exception:
+                pass
+        try:
+            return self._fabrica()
+        except Exception:
+            self._permisos.release()
+            raise
+
+    @staticmethod
+    def _sigue_viva(conexion) -> bool:
+        # is_connected() de mysql.connector hace un ping; otros drivers exponen ping()
+        try:
+            if hasattr(conexion, "is_connected"):
+                return bool(conexion.is_connected())
+            if hasattr(conexion, "ping"):
+                conexion.ping()
+            return True
+        except Exception:
+            return False
+
+    def _devolver(self, conexion, rota: bool) -> None:
+        try:
+            if rota:
+                try:
+                    conexion.close()
+                except Exception:
+                    pass
+            else:
+                self._libres.put(conexion)
+        finally:
+            self._permisos.release()
+
+    @contextmanager
+    def conexion(self) -> Iterator:
+        """
+        Presta una conexión y al terminar hace rollback antes de devolverla al
+        pool: lo que deba guardarse tiene que confirmarse con commit() dentro
+        del bloque (o con cursor(commit=True)).
+        """
+        conexion = self._adquirir()
+        rota = False
+        try:
+            yield conexion
+        finally:
+            # También tras un bloque que solo leyó: con autocommit apagado el
+            # SELECT abrió una transacción y, con REPEATABLE READ (InnoDB), la
+            # siguiente petición que use esta conexión vería la misma foto vieja
+            try:
+                conexion.rollback()
+            except Exception:
+                rota = True
+            self._devolver(conexion, rota)
+
+    @contextmanager
+    def cursor(self, commit: bool = False, **opciones) -> Iterator:
+        """Presta un cursor (con su conexión) y lo cierra al salir; opcionalmente hace commit."""
+        with self.conexion() as conexion:
+            cursor = conexion.cursor(**opciones)
+            try:
+                yield cursor
+                if commit:
+                    conexion.commit()
+            finally:
+                cursor.close()
+
+    def cerrar(self) -> None:
+        while True:
+            try:
+                self._libres.get_nowait().close()
+            except queue.Empty:
+                return
+            except Exception:
+                pass
+
+
+class UsuariosDAO:
+    COLUMNAS = ("nombre", "mail")
+    COLUMNA_ID = "id"
+    LIMITE_MAXIMO = 500
+    TAMANO_LOTE = 500
+
+    def __init__(self, pool: PoolConexiones) -> None:
+        self._pool = pool
+
+    def base_de_datos(self) -> Optional[str]:
+        with self._pool.cursor() as cur:
+            cur.execute("SELECT DATABASE();")
+            fila = cur.fetchone()
+        return fila[0] if fila else None
+
+    def insertar(self, nombre: str, mail: str) -> None:
+        with self._pool.cursor(commit=True) as cur:
+            cur.execute("INSERT INTO usuarios(nombre, mail) VALUES (%s, %s)", (nombre, mail))
+
+    def insertar_lote(self, filas: Sequence[Tuple[str, str]]) -> int:
+        """Inserta todas las filas en una sola transacción, en bloques de TAMANO_LOTE."""
+        with self._pool.cursor(commit=True) as cur:
+            for i in range(0, len(filas), self.TAMANO_LOTE):
+                cur.executemany(
+                    "INSERT INTO usuarios(nombre, mail) VALUES (%s, %s)",
+                    filas[i:i + self.TAMANO_LOTE],
+                )
+        return len(filas)
+
+    def listar(self, despues_de: int = 0, limite: int = 50) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Devuelve una página de usuarios con id > despues_de y el id desde el
+        que pedir la siguiente (None si no hay más). La paginación por clave
+        evita que MySQL recorra y descarte filas como con OFFSET.
+        """
+        limite = max(1, min(int(limite), self.LIMITE_MAXIMO))
+        # Cursor no bufferizado: las filas se leen del servidor a medida que se consumen
+        with self._pool.cursor(dictionary=True, buffered=False) as cur:
+            cur.execute(
+                f"SELECT * FROM usuarios WHERE {self.COLUMNA_ID} > %s ORDER BY {self.COLUMNA_ID} LIMIT %s",
+                (despues_de, limite + 1),
+            )
+            filas = cur.fetchmany(limite + 1)
+            cur.fetchall()  # consumir el resto antes de cerrar el cursor
+        siguiente = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            siguiente = filas[-1][self.COLUMNA_ID]
+        return filas, siguiente
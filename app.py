@@ -1,6 +1,8 @@
 from flask import Flask
+from instrumentacion import Instrumentacion
 
 app = Flask(__name__)
+instrumentacion = Instrumentacion(app)
 
 @app.route("/")
 def inicio():
@@ -0,0 +1,118 @@
+"""
+Prueba de carga: compara peticiones por segundo entre el servidor de
+desarrollo y los modos de servidor.py para una misma app.
+
+Uso:
+    python bench_servidor.py app.py
+    python bench_servidor.py work/1.py --ruta /productos --clientes 64 --modos dev prefork async
+
+Cada modo se arranca como subproceso en un puerto libre, se calienta y
+después se lanzan --peticiones GET repartidas entre --clientes hilos con
+conexiones keep-alive. Solo usa la librería estándar en el lado cliente.
+"""
+from __future__ import annotations
+import argparse
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Tuple
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def esperar_servidor(port: int, ruta: str, limite: float = 20.0) -> None:
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            con = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            con.request("GET", ruta)
+            con.getresponse().read()
+            con.close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"El servidor no respondió en el puerto {port}")
+
+
+def cliente(port: int, ruta: str, n: int, errores: List[int]) -> None:
+    con = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    for _ in range(n):
+        # Un reintento: el servidor puede cerrar una conexión keep-alive ociosa
+        for intento in range(2):
+            try:
+                con.request("GET", ruta)
+                resp = con.getresponse()
+                resp.read()
+                if resp.status >= 500:
+                    errores.append(1)
+                if resp.getheader("Connection", "").lower() == "close":
+                    con.close()
+                    con = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                break
+            except (OSError, http.client.HTTPException):
+                con.close()
+                con = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                if intento == 1:
+                    errores.append(1)
+    con.close()
+
+
+def medir(port: int, ruta: str, clientes: int, peticiones: int) -> Tuple[float, int]:
+    errores: List[int] = []
+    por_cliente = max(1, peticiones // clientes)
+    hilos = [threading.Thread(target=cliente, args=(port, ruta, por_cliente, errores)) for _ in range(clientes)]
+    inicio = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    duracion = time.perf_counter() - inicio
+    return por_cliente * clientes / duracion, len(errores)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archivo")
+    parser.add_argument("--ruta", default="/")
+    parser.add_argument("--clientes", type=int, default=32)
+    parser.add_argument("--peticiones", type=int, default=4000)
+    parser.add_argument("--modos", nargs="+", default=["dev", "waitress", "prefork", "async"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    args, extra = parser.parse_known_args(argv)
+
+    print(f"{'modo':<10}{'peticiones/s':>14}{'errores':>10}")
+    for modo in args.modos:
+        port = puerto_libre()
+        cmd = [
+            sys.executable, os.path.join(AQUI, "servidor.py"), args.archivo, "--modo", modo,
+            "--port", str(port), "--workers", str(args.workers), "--threads", str(args.threads), *extra,
+        ]
+        env = dict(os.environ, INSTRUMENTACION_HABILITADA=os.environ.get("INSTRUMENTACION_HABILITADA", "0"))
+        proceso = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+        try:
+            esperar_servidor(port, args.ruta)
+            medir(port, args.ruta, args.clientes, args.clientes * 10)  # calentamiento
+            rps, errores = medir(port, args.ruta, args.clientes, args.peticiones)
+            print(f"{modo:<10}{rps:>14.0f}{errores:>10}")
+        finally:
+            proceso.send_signal(signal.SIGTERM)
+            try:
+                proceso.wait(timeout=35)
+            except subprocess.TimeoutExpired:
+                proceso.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Build de archivos estáticos: minifica, pone huella de contenido y precomprime.
+
+    python build_estaticos.py            # CSS de la raíz -> dist/
+    python build_estaticos.py --origen mi_proyecto_flask/static --salida mi_proyecto_flask/dist
+
+Pasos:
+1. Minifica los CSS de la carpeta de origen y les añade un hash del contenido
+   al nombre (styles.css -> styles.3f2a9c1d0b.css).
+2. Guarda una copia .gz y, si está instalado el paquete `brotli`, una .br de
+   cada archivo, para servirlos sin comprimir en cada petición.
+3. Escribe <salida>/manifest.json con la carpeta de origen y el mapa nombre
+   original -> nombre con hash, que usa estaticos.py para servirlos desde
+   Flask con caché inmutable.
+
+Las plantillas no se tocan: url_for('static', ...) ya devuelve el nombre con
+hash en tiempo de ejecución. El manifest solo se aplica a la app cuya carpeta
+static es la de origen; cada carpeta static necesita su propio build.
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from typing import Dict
+
+try:
+    import brotli
+except ImportError:  # opcional: sin él solo se genera .gz
+    brotli = None
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# Rutas relativas a la carpeta de origen
+ASSETS_CSS = ["styles.css"]
+# Extensiones que vale la pena precomprimir
+COMPRIMIBLES = (".css", ".html", ".js", ".svg", ".json")
+LARGO_HASH = 10
+
+
+# ----------------------------
+# Minificación
+# ----------------------------
+def minificar_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    # El espacio antes de ":" no se quita: "div :hover" no es "div:hover"
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+# ----------------------------
+# Huella y compresión
+# ----------------------------
+def con_hash(ruta: str, contenido: bytes) -> str:
+    raiz, ext = os.path.splitext(ruta)
+    huella = hashlib.sha256(contenido).hexdigest()[:LARGO_HASH]
+    return f"{raiz}.{huella}{ext}"
+
+
+def escribir(destino: str, contenido: bytes) -> None:
+    os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+    with open(destino, "wb") as f:
+        f.write(contenido)
+    if os.path.splitext(destino)[1] not in COMPRIMIBLES:
+        return
+    # mtime=0 para que el .gz sea reproducible entre builds
+    with open(destino + ".gz", "wb") as f:
+        f.write(gzip.compress(contenido, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(destino + ".br", "wb") as f:
+            f.write(brotli.compress(contenido, quality=11))
+
+
+def construir(salida: str, origen: str = RAIZ) -> Dict[str, str]:
+    if os.path.isdir(salida):
+        shutil.rmtree(salida)
+    archivos: Dict[str, str] = {}
+
+    for ruta in ASSETS_CSS:
+        ruta_origen = os.path.join(origen, ruta)
+        if not os.path.exists(ruta_origen):
+            continue
+        with open(ruta_origen, encoding="utf-8") as f:
+            contenido = minificar_css(f.read()).encode("utf-8")
+        hasheado = con_hash(ruta, contenido).replace(os.sep, "/")
+        escribir(os.path.join(salida, hasheado), contenido)
+        archivos[ruta] = hasheado
+
+    # Origen relativo a la raíz del repositorio: el build sigue valiendo si se mueve el checkout
+    relativo = os.path.relpath(os.path.abspath(origen), RAIZ).replace(os.sep, "/")
+    manifest = {"origen": relativo, "archivos": archivos}
+    os.makedirs(salida, exist_ok=True)
+    with open(os.path.join(salida, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return archivos
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Minifica, pone hash y precomprime los estáticos.")
+    parser.add_argument("--origen", default=RAIZ, help="carpeta static de la app (por defecto la raíz)")
+    parser.add_argument("--salida", default=os.path.join(RAIZ, "dist"))
+    args = parser.parse_args(argv)
+    manifest = construir(args.salida, args.origen)
+    for original, hasheado in manifest.items():
+        print(f"{original} -> {hasheado}")
+    if brotli is None:
+        print("Aviso: paquete 'brotli' no instalado, solo se generaron .gz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Sirve desde Flask los estáticos generados por build_estaticos.py.
+
+- url_for('static', filename='styles.css') devuelve el nombre con hash del
+  manifest (styles.3f2a9c1d0b.css), así que las plantillas no cambian.
+- Los archivos con hash se sirven con `Cache-Control: immutable` y un año de
+  max-age: en visitas repetidas el navegador no vuelve a pedirlos.
+- Si el cliente acepta br o gzip se envía la copia precomprimida.
+- Cualquier otro archivo sigue sirviéndose desde la carpeta static de la app.
+- El manifest solo se aplica si se construyó a partir de la carpeta static de
+  esta app (build_estaticos.py --origen): otra app con su propio styles.css
+  no recibe los nombres con hash de un build ajeno.
+
+Uso:
+    app = Flask(__name__)
+    Estaticos(app)
+
+Configuración (app.config o variable de entorno):
+    ESTATICOS_DIR   carpeta generada por el build (por defecto dist/ junto a este archivo);
+                    con varias apps, un build y una carpeta por cada carpeta static
+"""
+from __future__ import annotations
+import json
+import mimetypes
+import os
+from typing import Dict, Optional
+
+from flask import Flask, abort, request, send_file
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+DIR_POR_DEFECTO = os.path.join(RAIZ, "dist")
+UN_ANO = 365 * 24 * 3600
+# Orden de preferencia de las codificaciones precomprimidas
+CODIFICACIONES = (("br", ".br"), ("gzip", ".gz"))
+
+
+class Estaticos:
+    def __init__(self, app: Optional[Flask] = None) -> None:
+        self.carpeta = DIR_POR_DEFECTO
+        self.manifest: Dict[str, str] = {}
+        self._hasheados: set[str] = set()
+        self._vista_original = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        self.carpeta = app.config.get("ESTATICOS_DIR", os.environ.get("ESTATICOS_DIR", DIR_POR_DEFECTO))
+        ruta_manifest = os.path.join(self.carpeta, "manifest.json")
+        if not os.path.exists(ruta_manifest):
+            # Sin build no hay nada que servir: la app sigue con su static normal
+            return
+        with open(ruta_manifest, encoding="utf-8") as f:
+            datos = json.load(f)
+        origen = datos.get("origen")
+        if origen is None or not app.static_folder or (
+            os.path.realpath(os.path.join(RAIZ, origen)) != os.path.realpath(app.static_folder)
+        ):
+            # Build de otra carpeta static (o de antes de registrar el origen)
+            return
+        self.manifest = datos["archivos"]
+        self._hasheados = set(self.manifest.values())
+
+        self._vista_original = app.view_functions.get("static")
+        if self._vista_original is None:
+            app.add_url_rule(f"{app.static_url_path or '/static'}/<path:filename>", "static", self.servir)
+        app.view_functions["static"] = self.servir
+        app.url_defaults(self._url_defaults)
+        app.extensions["estaticos"] = self
+
+    def _url_defaults(self, endpoint: str, values: dict) -> None:
+        if endpoint == "static":
+            nombre = values.get("filename")
+            if nombre in self.manifest:
+                values["filename"] = self.manifest[nombre]
+
+    def servir(self, filename: str):
+        if filename not in self._hasheados:
+            if self._vista_original is None:
+                abort(404)
+            return self._vista_original(filename=filename)
+
+        ruta = os.path.join(self.carpeta, filename)
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        aceptadas = request.accept_encodings
+        codificacion = None
+        for nombre, extension in CODIFICACIONES:
+            if aceptadas[nombre] and os.path.exists(ruta + extension):
+                ruta, codificacion = ruta + extension, nombre
+                break
+        if not os.path.exists(ruta):
+            abort(404)
+
+        respuesta = send_file(
+            ruta, mimetype=mimetype, download_name=filename, conditional=True, max_age=UN_ANO
+        )
+        if codificacion:
+            respuesta.headers["Content-Encoding"] = codificacion
+        respuesta.headers["Vary"] = "Accept-Encoding"
+        respuesta.cache_control.public = True
+        respuesta.cache_control.immutable = True
+        return respuesta
@@ -0,0 +1,357 @@
+"""
+Instrumentación compartida para las apps Flask del repositorio.
+
+Mide cuánto tarda cada petición y en qué se va el tiempo:
+- Histograma de latencia por ruta (endpoint + método).
+- Número de consultas SQL y tiempo total de SQL por petición (envolviendo los cursores).
+- Tiempo de conexión a la base de datos por petición.
+- Tiempo de render de cada plantilla Jinja y total de render por petición.
+- Log de consultas y peticiones lentas según umbrales configurables.
+- Endpoint /metrics en formato de texto de Prometheus (por defecto solo desde la propia máquina).
+
+Uso:
+    app = Flask(__name__)
+    instrumentacion = Instrumentacion(app)
+
+    @instrumentacion.envolver_conexion
+    def conexionBD():
+        return mysql.connector.connect(...)
+
+Configuración (app.config o variables de entorno con el mismo nombre):
+    INSTRUMENTACION_HABILITADA      True/False (por defecto False: hay que activarla)
+    INSTRUMENTACION_SQL_LENTA_MS    umbral para loguear una consulta lenta (por defecto 100)
+    INSTRUMENTACION_REQUEST_LENTA_MS umbral para loguear una petición lenta (por defecto 500)
+    INSTRUMENTACION_RUTA_METRICAS   ruta del endpoint de métricas (por defecto /metrics)
+    INSTRUMENTACION_METRICAS_IPS    IPs que pueden leer /metrics, separadas por comas
+                                    (por defecto 127.0.0.1,::1; "*" para cualquiera)
+    INSTRUMENTACION_SERVER_TIMING   True/False, enviar la cabecera Server-Timing con los
+                                    tiempos de DB y render al cliente (por defecto False)
+
+Con la instrumentación deshabilitada no se registra ningún hook ni se envuelve
+ninguna conexión: las funciones originales se devuelven tal cual.
+"""
+from __future__ import annotations
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, abort, before_render_template, g, has_request_context, request, template_rendered
+
+logger = logging.getLogger("instrumentacion")
+
+# Límites superiores (en segundos) de los buckets de latencia
+BUCKETS_SEGUNDOS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Límites de los buckets del número de consultas por petición
+BUCKETS_CONSULTAS: Tuple[float, ...] = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def leer_bool(valor) -> bool:
+    if isinstance(valor, str):
+        return valor.strip().lower() not in ("0", "false", "no", "off", "")
+    return bool(valor)
+
+
+def _escapar_etiqueta(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# ----------------------------
+# Histograma compatible con Prometheus
+# ----------------------------
+class _Histograma:
+    """Histograma acumulativo por conjunto de etiquetas (no es thread-safe por sí solo)."""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...], buckets: Tuple[float, ...]) -> None:
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.buckets = buckets
+        # valores de etiquetas -> [conteos por bucket..., +Inf], suma
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observar(self, valores: Tuple[str, ...], valor: float) -> None:
+        serie = self._series.get(valores)
+        if serie is None:
+            serie = ([0] * (len(self.buckets) + 1), [0.0])
+            self._series[valores] = serie
+        conteos, suma = serie
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                conteos[i] += 1
+        conteos[-1] += 1
+        suma[0] += valor
+
+    def exponer(self) -> List[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        for valores, (conteos, suma) in sorted(self._series.items()):
+            base = ",".join(f'{k}="{_escapar_etiqueta(v)}"' for k, v in zip(self.etiquetas, valores))
+            sep = "," if base else ""
+            for limite, conteo in zip(self.buckets, conteos):
+                lineas.append(f'{self.nombre}_bucket{{{base}{sep}le="{limite:g}"}} {conteo}')
+            lineas.append(f'{self.nombre}_bucket{{{base}{sep}le="+Inf"}} {conteos[-1]}')
+            lineas.append(f"{self.nombre}_sum{{{base}}} {suma[0]:.6f}")
+            lineas.append(f"{self.nombre}_count{{{base}}} {conteos[-1]}")
+        return lineas
+
+
+class _Contador:
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...]) -> None:
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._series: Dict[Tuple[str, ...], float] = {}
+
+    def incrementar(self, valores: Tuple[str, ...], cantidad: float = 1) -> None:
+        self._series[valores] = self._series.get(valores, 0) + cantidad
+
+    def exponer(self) -> List[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        for valores, total in sorted(self._series.items()):
+            base = ",".join(f'{k}="{_escapar_etiqueta(v)}"' for k, v in zip(self.etiquetas, valores))
+            lineas.append(f"{self.nombre}{{{base}}} {total:g}")
+        return lineas
+
+
+# ----------------------------
+# Envoltorios de conexión y cursor (DB-API)
+# ----------------------------
+class _CursorInstrumentado:
+    """Delegado de un cursor DB-API que mide execute/executemany."""
+
+    def __init__(self, cursor, instrumentacion: "Instrumentacion") -> None:
+        self._cursor = cursor
+        self._instrumentacion = instrumentacion
+
+    def execute(self, sql, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, *args, **kwargs)
+        finally:
+            self._instrumentacion.registrar_consulta(sql, time.perf_counter() - inicio)
+
+    def executemany(self, sql, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, *args, **kwargs)
+        finally:
+            self._instrumentacion.registrar_consulta(sql, time.perf_counter() - inicio)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cursor.__exit__(*exc)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class _ConexionInstrumentada:
+    """Delegado de una conexión DB-API cuyos cursores quedan instrumentados."""
+
+    def __init__(self, conexion, instrumentacion: "Instrumentacion") -> None:
+        self._conexion = conexion
+        self._instrumentacion = instrumentacion
+
+    def cursor(self, *args, **kwargs):
+        return _CursorInstrumentado(self._conexion.cursor(*args, **kwargs), self._instrumentacion)
+
+    def __enter__(self):
+        self._conexion.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conexion.__exit__(*exc)
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+# ----------------------------
+# Extensión Flask
+# ----------------------------
+class Instrumentacion:
+    def __init__(self, app: Optional[Flask] = None) -> None:
+        self.habilitada = False
+        self.sql_lenta = 0.1
+        self.request_lenta = 0.5
+        self.ips_metricas: set[str] = {"127.0.0.1", "::1"}
+        self.server_timing = False
+        self._lock = threading.Lock()
+        self._latencia = _Histograma(
+            "http_request_duration_seconds", "Latencia de las peticiones HTTP por ruta.",
+            ("endpoint", "method"), BUCKETS_SEGUNDOS,
+        )
+        self._peticiones = _Contador(
+            "http_requests_total", "Peticiones HTTP atendidas.", ("endpoint", "method", "status"),
+        )
+        self._consultas_por_peticion = _Histograma(
+            "sql_queries_per_request", "Consultas SQL ejecutadas por petición.",
+            ("endpoint",), BUCKETS_CONSULTAS,
+        )
+        self._sql_por_peticion = _Histograma(
+            "sql_duration_per_request_seconds", "Tiempo total de SQL por petición.",
+            ("endpoint",), BUCKETS_SEGUNDOS,
+        )
+        self._conexion_por_peticion = _Histograma(
+            "db_connect_duration_per_request_seconds", "Tiempo abriendo conexiones por petición.",
+            ("endpoint",), BUCKETS_SEGUNDOS,
+        )
+        self._consultas_lentas = _Contador(
+            "sql_slow_queries_total", "Consultas que superaron el umbral de consulta lenta.", ("endpoint",),
+        )
+        self._render = _Histograma(
+            "template_render_duration_seconds", "Tiempo de render de cada plantilla.",
+            ("template",), BUCKETS_SEGUNDOS,
+        )
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        def config(clave: str, defecto):
+            return app.config.get(clave, os.environ.get(clave, defecto))
+
+        self.habilitada = leer_bool(config("INSTRUMENTACION_HABILITADA", False))
+        if not self.habilitada:
+            return
+        self.sql_lenta = float(config("INSTRUMENTACION_SQL_LENTA_MS", 100)) / 1000
+        self.request_lenta = float(config("INSTRUMENTACION_REQUEST_LENTA_MS", 500)) / 1000
+        ruta_metricas = config("INSTRUMENTACION_RUTA_METRICAS", "/metrics")
+        ips = config("INSTRUMENTACION_METRICAS_IPS", "127.0.0.1,::1")
+        if isinstance(ips, str):
+            ips = ips.split(",")
+        self.ips_metricas = {ip.strip() for ip in ips if ip.strip()}
+        self.server_timing = leer_bool(config("INSTRUMENTACION_SERVER_TIMING", False))
+
+        app.before_request(self._antes_de_peticion)
+        app.after_request(self._despues_de_peticion)
+        before_render_template.connect(self._antes_de_render, app)
+        template_rendered.connect(self._despues_de_render, app)
+        app.add_url_rule(ruta_metricas, "metricas", self.vista_metricas)
+        app.extensions["instrumentacion"] = self
+
+    # --- Hooks de petición ---
+    def _antes_de_peticion(self) -> None:
+        g._inst_inicio = time.perf_counter()
+        g._inst_consultas = 0
+        g._inst_sql = 0.0
+        g._inst_conexion = 0.0
+        g._inst_render = 0.0
+        g._inst_renders = []
+
+    def _despues_de_peticion(self, respuesta: Response) -> Response:
+        inicio = g.get("_inst_inicio")
+        if inicio is None:
+            return respuesta
+        duracion = time.perf_counter() - inicio
+        endpoint = request.endpoint or "desconocido"
+        consultas, sql, conexion, render = g._inst_consultas, g._inst_sql, g._inst_conexion, g._inst_render
+        with self._lock:
+            self._latencia.observar((endpoint, request.method), duracion)
+            self._peticiones.incrementar((endpoint, request.method, str(respuesta.status_code)))
+            self._consultas_por_peticion.observar((endpoint,), consultas)
+            self._sql_por_peticion.observar((endpoint,), sql)
+            self._conexion_por_peticion.observar((endpoint,), conexion)
+        # Desglose visible en las herramientas de desarrollo del navegador (expone
+        # tiempos internos: solo si se pidió explícitamente)
+        if self.server_timing:
+            respuesta.headers.add(
+                "Server-Timing",
+                f"db-connect;dur={conexion * 1000:.2f}, sql;dur={sql * 1000:.2f};desc=\"{consultas} consultas\", "
+                f"render;dur={render * 1000:.2f}, total;dur={duracion * 1000:.2f}",
+            )
+        if duracion >= self.request_lenta:
+            logger.warning(
+                "Petición lenta %s %s: %.1f ms (conexión %.1f ms, %d consultas SQL en %.1f ms, render %.1f ms)",
+                request.method, request.path, duracion * 1000, conexion * 1000, consultas, sql * 1000,
+                render * 1000,
+            )
+        return respuesta
+
+    # --- Render de plantillas (señales de Flask) ---
+    def _antes_de_render(self, sender, template, context, **extra) -> None:
+        if has_request_context() and "_inst_renders" in g:
+            g._inst_renders.append(time.perf_counter())
+
+    def _despues_de_render(self, sender, template, context, **extra) -> None:
+        if not has_request_context() or not g.get("_inst_renders"):
+            return
+        duracion = time.perf_counter() - g._inst_renders.pop()
+        # Las plantillas anidadas (render_template dentro de otra) solo suman una vez
+        if not g._inst_renders:
+            g._inst_render += duracion
+        with self._lock:
+            self._render.observar((template.name or "<string>",), duracion)
+
+    # --- Registro de SQL ---
+    def registrar_consulta(self, sql, duracion: float) -> None:
+        endpoint = "fuera_de_peticion"
+        if has_request_context():
+            endpoint = request.endpoint or "desconocido"
+            g._inst_consultas = g.get("_inst_consultas", 0) + 1
+            g._inst_sql = g.get("_inst_sql", 0.0) + duracion
+        if duracion >= self.sql_lenta:
+            with self._lock:
+                self._consultas_lentas.incrementar((endpoint,))
+            logger.warning("Consulta lenta (%.1f ms) en %s: %s", duracion * 1000, endpoint, sql)
+
+    def registrar_conexion(self, duracion: float) -> None:
+        if has_request_context():
+            g._inst_conexion = g.get("_inst_conexion", 0.0) + duracion
+
+    def envolver_conexion(self, obtener_conexion: Callable) -> Callable:
+        """
+        Decora una función que devuelve una conexión DB-API para medir el
+        tiempo de conexión y el de cada consulta hecha con sus cursores.
+        Si la instrumentación está deshabilitada devuelve la función original.
+        """
+        if not self.habilitada:
+            return obtener_conexion
+
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            conexion = obtener_conexion(*args, **kwargs)
+            self.registrar_conexion(time.perf_counter() - inicio)
+            return _ConexionInstrumentada(conexion, self)
+
+        envoltura.__name__ = getattr(obtener_conexion, "__name__", "obtener_conexion")
+        envoltura.__doc__ = getattr(obtener_conexion, "__doc__", None)
+        return envoltura
+
+    def instrumentar_engine(self, engine) -> None:
+        """Registra eventos de SQLAlchemy para medir las consultas de un Engine."""
+        if not self.habilitada:
+            return
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _antes(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("_inst_inicios", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _despues(conn, cursor, statement, parameters, context, executemany):
+            inicio = conn.info["_inst_inicios"].pop()
+            self.registrar_consulta(statement, time.perf_counter() - inicio)
+
+    # --- Exposición ---
+    def exponer(self) -> str:
+        with self._lock:
+            lineas: List[str] = []
+            for metrica in (
+                self._latencia, self._peticiones, self._consultas_por_peticion,
+                self._sql_por_peticion, self._conexion_por_peticion, self._consultas_lentas, self._render,
+            ):
+                lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+    def vista_metricas(self) -> Response:
+        # Sin autenticación: por defecto solo se responde a la propia máquina
+        if "*" not in self.ips_metricas and request.remote_addr not in self.ips_metricas:
+            abort(404)
+        return Response(self.exponer(), mimetype="text/plain; version=0.0.4; charset=utf-8")
@@ -12,11 +12,22 @@ code = dedent('''
     - CRUD completo conectado a SQLite
     - Menú interactivo por consola
     - Código comentado y organizado
+    - Registro de cambios (CDC) para sincronización incremental y snapshots
+    - Arranque rápido desde un snapshot binario mapeado en memoria (mmap)
     """
     from __future__ import annotations
+    import mmap
+    import os
+    import secrets
     import sqlite3
+    import struct
+    import sys
+    from array import array
+    from bisect import bisect_left
+    from collections.abc import MutableMapping, MutableSet
+    from contextlib import contextmanager
     from dataclasses import dataclass, field
-    from typing import Dict, List, Optional, Tuple
+    from typing import Dict, Iterator, List, Optional, Tuple
     
     
     # ----------------------------
@@ -58,6 +69,260 @@ code = dedent('''
             return f"[{self.id}] {self.nombre} | Cantidad: {self.cantidad} | Precio: ${self.precio:.2f}"
     
     
+    @dataclass(frozen=True)
+    class Cambio:
+        """
+        Entrada del registro de cambios. Guarda la fila completa tras el cambio
+        (nombre/cantidad/precio en None para una baja), así aplicar un cambio no
+        depende del estado anterior y repetirlo no hace daño.
+        """
+        seq: int
+        operacion: str  # 'alta', 'baja', 'cantidad' o 'precio'
+        producto_id: int
+        nombre: Optional[str]
+        cantidad: Optional[int]
+        precio: Optional[float]
+    
+        def producto(self) -> Optional[Producto]:
+            if self.operacion == "baja":
+                return None
+            return Producto(self.producto_id, self.nombre, self.cantidad, self.precio)
+    
+    
+    class CambiosCompactados(ValueError):
+        """Los cambios pedidos ya se compactaron: hay que partir de leer_snapshot()."""
+    
+    
+    # Triggers que escriben el registro de cambios en la misma transacción que la
+    # escritura. Un UPDATE que cambia el id o el nombre se registra como baja + alta;
+    # si solo cambian cantidad y/o precio, una entrada por columna (cada una con la
+    # fila completa, así aplicarlas en orden deja el mismo estado).
+    SQL_TRIGGERS_CAMBIOS = """
+    CREATE TRIGGER IF NOT EXISTS cambios_alta AFTER INSERT ON productos BEGIN
+        INSERT INTO cambios (operacion, producto_id, nombre, cantidad, precio)
+        VALUES ('alta', NEW.id, NEW.nombre, NEW.cantidad, NEW.precio);
+    END;
+    CREATE TRIGGER IF NOT EXISTS cambios_baja AFTER DELETE ON productos BEGIN
+        INSERT INTO cambios (operacion, producto_id) VALUES ('baja', OLD.id);
+    END;
+    CREATE TRIGGER IF NOT EXISTS cambios_actualizacion AFTER UPDATE ON productos BEGIN
+        INSERT INTO cambios (operacion, producto_id)
+        SELECT 'baja', OLD.id WHERE OLD.id IS NOT NEW.id OR OLD.nombre IS NOT NEW.nombre;
+        INSERT INTO cambios (operacion, producto_id, nombre, cantidad, precio)
+        SELECT 'alta', NEW.id, NEW.nombre, NEW.cantidad, NEW.precio
+        WHERE OLD.id IS NOT NEW.id OR OLD.nombre IS NOT NEW.nombre;
+        INSERT INTO cambios (operacion, producto_id, nombre, cantidad, precio)
+        SELECT 'cantidad', NEW.id, NEW.nombre, NEW.cantidad, NEW.precio
+        WHERE OLD.id IS NEW.id AND OLD.nombre IS NEW.nombre AND OLD.cantidad IS NOT NEW.cantidad;
+        INSERT INTO cambios (operacion, producto_id, nombre, cantidad, precio)
+        SELECT 'precio', NEW.id, NEW.nombre, NEW.cantidad, NEW.precio
+        WHERE OLD.id IS NEW.id AND OLD.nombre IS NEW.nombre AND OLD.precio IS NOT NEW.precio;
+    END;
+    """
+    
+    
+    # ----------------------------
+    # Caché persistente (snapshot binario mapeado en memoria)
+    # ----------------------------
+    # Formato del archivo (little-endian, secciones alineadas a 8 bytes):
+    #   cabecera   MAGIC, versión, id de la base, seq del registro de cambios, n filas, bytes de nombres
+    #   ids        n x int64, ordenados (búsqueda binaria)
+    #   cantidades n x int64
+    #   precios    n x float64
+    #   offsets    (n + 1) x int64 dentro del bloque de nombres
+    #   orden      n x int64: filas ordenadas por nombre en minúsculas
+    #   nombres    UTF-8 concatenados
+    MAGIC_CACHE = b"INVCACHE"
+    VERSION_CACHE = 2
+    _CABECERA = struct.Struct("<8sIIqqqq")
+    
+    
+    def _alinear(n: int) -> int:
+        return (n + 7) & ~7
+    
+    
+    def escribir_archivo_cache(ruta: str, id_base: int, seq: int, filas: List[Tuple[int, str, int, float]]) -> None:
+        """Escribe el snapshot binario de `filas` (ordenadas por id) de forma atómica."""
+        ids = array("q")
+        cantidades = array("q")
+        precios = array("d")
+        offsets = array("q", [0])
+        nombres = bytearray()
+        minusculas: List[str] = []
+        for pid, nombre, cantidad, precio in filas:
+            ids.append(pid)
+            cantidades.append(cantidad)
+            precios.append(precio)
+            nombres += nombre.encode("utf-8")
+            offsets.append(len(nombres))
+            minusculas.append(nombre.lower())
+        orden = array("q", sorted(range(len(minusculas)), key=minusculas.__getitem__))
+        if sys.byteorder != "little":
+            for a in (ids, cantidades, precios, offsets, orden):
+                a.byteswap()
+    
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(_CABECERA.pack(MAGIC_CACHE, VERSION_CACHE, 0, id_base, seq, len(ids), len(nombres)))
+            f.write(b"\\0" * (_alinear(_CABECERA.size) - _CABECERA.size))
+            for a in (ids, cantidades, precios, offsets, orden):
+                f.write(a.tobytes())
+            f.write(nombres)
+        os.replace(temporal, ruta)
+    
+    
+    class ArchivoCache:
+        """Snapshot binario abierto con mmap: no crea objetos hasta que se consultan."""
+    
+        def __init__(self, ruta: str) -> None:
+            with open(ruta, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                magic, version, _, self.id_base, self.seq, self.n, largo_nombres = _CABECERA.unpack_from(self._mm, 0)
+                if magic != MAGIC_CACHE or version != VERSION_CACHE or sys.byteorder != "little":
+                    raise ValueError("Archivo de caché con formato distinto.")
+                vista = memoryview(self._mm)
+                pos = _alinear(_CABECERA.size)
+                secciones = []
+                for formato, cantidad in (("q", self.n), ("q", self.n), ("d", self.n), ("q", self.n + 1), ("q", self.n)):
+                    secciones.append(vista[pos:pos + 8 * cantidad].cast(formato))
+                    pos += 8 * cantidad
+                self.ids, self.cantidades, self.precios, self.offsets, self.orden = secciones
+                self.nombres = vista[pos:pos + largo_nombres]
+                if len(self.nombres) != largo_nombres:
+                    raise ValueError("Archivo de caché truncado.")
+                self._vistas = [vista, *secciones, self.nombres]
+            except (struct.error, ValueError, TypeError):
+                self.cerrar()
+                raise ValueError(f"Archivo de caché inválido: {ruta}") from None
+    
+        def fila(self, product_id: int) -> int:
+            i = bisect_left(self.ids, product_id)
+            return i if i < self.n and self.ids[i] == product_id else -1
+    
+        def nombre(self, i: int) -> str:
+            return bytes(self.nombres[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+    
+        def producto(self, i: int) -> Producto:
+            return Producto(self.ids[i], self.nombre(i), self.cantidades[i], self.precios[i])
+    
+        def contiene_nombre(self, nombre_lower: str) -> bool:
+            # Búsqueda binaria sobre el índice de nombres en minúsculas
+            bajo, alto = 0, self.n
+            while bajo < alto:
+                medio = (bajo + alto) // 2
+                actual = self.nombre(self.orden[medio]).lower()
+                if actual == nombre_lower:
+                    return True
+                if actual < nombre_lower:
+                    bajo = medio + 1
+                else:
+                    alto = medio
+            return False
+    
+        def cerrar(self) -> None:
+            for v in getattr(self, "_vistas", []):
+                v.release()
+            self._vistas = []
+            self._mm.close()
+    
+    
+    class ProductosMapeados(MutableMapping):
+        """
+        dict[int, Producto] respaldado por un ArchivoCache. Los productos se crean
+        al consultarlos y se guardan en `_vivos`, así las modificaciones en sitio
+        (set_cantidad, set_precio) se conservan como en un dict normal.
+        """
+    
+        def __init__(self, archivo: ArchivoCache) -> None:
+            self._archivo = archivo
+            self._vivos: Dict[int, Producto] = {}
+            self._borrados: set[int] = set()  # filas del archivo eliminadas
+            self._nuevos = 0  # claves de _vivos que no están en el archivo
+    
+        def __getitem__(self, product_id: int) -> Producto:
+            p = self._vivos.get(product_id)
+            if p is not None:
+                return p
+            i = -1 if product_id in self._borrados else self._archivo.fila(product_id)
+            if i < 0:
+                raise KeyError(product_id)
+            p = self._vivos[product_id] = self._archivo.producto(i)
+            return p
+    
+        def __contains__(self, product_id: object) -> bool:
+            if product_id in self._vivos:
+                return True
+            return product_id not in self._borrados and self._archivo.fila(product_id) >= 0
+    
+        def __setitem__(self, product_id: int, producto: Producto) -> None:
+            if product_id not in self._vivos:
+                if self._archivo.fila(product_id) >= 0:
+                    self._borrados.discard(product_id)
+                else:
+                    self._nuevos += 1
+            self._vivos[product_id] = producto
+    
+        def __delitem__(self, product_id: int) -> None:
+            en_archivo = self._archivo.fila(product_id) >= 0
+            if product_id in self._vivos:
+                del self._vivos[product_id]
+                if en_archivo:
+                    self._borrados.add(product_id)
+                else:
+                    self._nuevos -= 1
+            elif en_archivo and product_id not in self._borrados:
+                self._borrados.add(product_id)
+            else:
+                raise KeyError(product_id)
+    
+        def __iter__(self) -> Iterator[int]:
+            for pid in self._archivo.ids:
+                if pid not in self._borrados:
+                    yield pid
+            for pid in list(self._vivos):
+                if self._archivo.fila(pid) < 0:
+                    yield pid
+    
+        def __len__(self) -> int:
+            return self._archivo.n - len(self._borrados) + self._nuevos
+    
+    
+    class NombresMapeados(MutableSet):
+        """set[str] de nombres en minúsculas respaldado por el índice ordenado del ArchivoCache."""
+    
+        def __init__(self, archivo: ArchivoCache) -> None:
+            self._archivo = archivo
+            self._agregados: set[str] = set()  # nunca están en el archivo
+            self._quitados: set[str] = set()  # siempre están en el archivo
+    
+        def __contains__(self, nombre: object) -> bool:
+            if nombre in self._agregados:
+                return True
+            return nombre not in self._quitados and self._archivo.contiene_nombre(nombre)
+    
+        def add(self, nombre: str) -> None:
+            if self._archivo.contiene_nombre(nombre):
+                self._quitados.discard(nombre)
+            else:
+                self._agregados.add(nombre)
+    
+        def discard(self, nombre: str) -> None:
+            self._agregados.discard(nombre)
+            if self._archivo.contiene_nombre(nombre):
+                self._quitados.add(nombre)
+    
+        def __iter__(self) -> Iterator[str]:
+            for i in range(self._archivo.n):
+                nombre = self._archivo.nombre(i).lower()
+                if nombre not in self._quitados:
+                    yield nombre
+            yield from list(self._agregados)
+    
+        def __len__(self) -> int:
+            return self._archivo.n - len(self._quitados) + len(self._agregados)
+    
+    
     # ----------------------------
     # Repositorio + Servicio
     # ----------------------------
@@ -69,19 +334,47 @@ code = dedent('''
             - list[Producto] para devolver listados ordenados
             - set[str] para validar unicidad rápida de nombres (opcional)
             - tuple para respuestas inmutables desde DB
+        - Cada escritura (también las hechas fuera de esta clase, vía triggers) añade
+          en la misma transacción una fila a la tabla `cambios` (registro append-only
+          con número de secuencia), para que otros consumidores pidan solo lo que
+          cambió con cambios_desde(seq). compactar() guarda un
+          snapshot de productos y recorta el registro.
+        - Con `archivo_cache` el estado se guarda al cerrar en un archivo binario que
+          el siguiente arranque mapea en memoria (sin recorrer la tabla ni crear
+          objetos); si quedó atrasado se le aplican los cambios del registro.
         """
     
-        def __init__(self, ruta_db: str = "inventario.db") -> None:
+        def __init__(
+            self,
+            ruta_db: str = "inventario.db",
+            wal: bool = False,
+            snapshot: Optional[Tuple[int, List[Producto]]] = None,
+            limite_cambios: Optional[int] = None,
+            archivo_cache: Optional[str] = None,
+        ) -> None:
             self.ruta_db = ruta_db
             self._conn = sqlite3.connect(self.ruta_db)
             self._conn.execute("PRAGMA foreign_keys = ON;")
+            if wal:
+                # WAL permite que otras conexiones lean mientras esta escribe
+                self._conn.execute("PRAGMA journal_mode = WAL;")
+            # Si se indica, compactar automáticamente al superar este número de cambios
+            self.limite_cambios = limite_cambios
+            # Último seq escrito en el registro y seq del último snapshot
+            self._seq = 0
+            self._seq_snapshot = 0
             self._crear_tabla_si_no_existe()
     
             # Caché: id -> Producto (colección base para O(1) por ID)
             self._cache: Dict[int, Producto] = {}
             # Set de nombres para chequeo rápido de duplicados
             self._nombres: set[str] = set()
-            self._cargar_cache_desde_db()
+            # Snapshot binario mapeado (si se usa) y el seq con el que se escribió
+            self.archivo_cache = archivo_cache
+            self._archivo: Optional[ArchivoCache] = None
+            self._seq_archivo: Optional[int] = None
+            if not (archivo_cache and self._cargar_cache_desde_archivo(archivo_cache)):
+                self._cargar_cache_desde_db(snapshot)
     
         # --- Infraestructura SQLite ---
         def _crear_tabla_si_no_existe(self) -> None:
@@ -94,9 +387,76 @@ code = dedent('''
             );
             """
             self._conn.execute(sql)
+            # Registro de cambios: AUTOINCREMENT para no reutilizar seq tras compactar
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cambios (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                operacion TEXT NOT NULL CHECK (operacion IN ('alta', 'baja', 'cantidad', 'precio')),
+                producto_id INTEGER NOT NULL,
+                nombre TEXT,
+                cantidad INTEGER,
+                precio REAL
+            );
+            """)
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshot_productos (
+                id INTEGER PRIMARY KEY,
+                nombre TEXT NOT NULL,
+                cantidad INTEGER NOT NULL,
+                precio REAL NOT NULL
+            );
+            """)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshot_meta (clave TEXT PRIMARY KEY, valor INTEGER NOT NULL);"
+            )
+            # El registro lo llenan triggers: así cuenta también las escrituras hechas
+            # sin pasar por Inventario (otro programa, sqlite3 a mano, cargas masivas)
+            self._conn.executescript(SQL_TRIGGERS_CAMBIOS)
             self._conn.commit()
+            # compactar() vacía el registro, así que MAX(seq) puede quedar en 0: el último
+            # seq asignado lo conserva sqlite_sequence (AUTOINCREMENT) y, como mínimo, es el del snapshot
+            self._seq = self._conn.execute(
+                "SELECT MAX((SELECT COALESCE(MAX(seq), 0) FROM cambios),"
+                " (SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'cambios'),"
+                " (SELECT COALESCE(MAX(valor), 0) FROM snapshot_meta WHERE clave = 'seq'));"
+            ).fetchone()[0]
+            # Identificador aleatorio de esta base: un archivo de caché solo vale para la base que lo escribió
+            fila = self._conn.execute("SELECT valor FROM snapshot_meta WHERE clave = 'id_base';").fetchone()
+            if fila is None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO snapshot_meta (clave, valor) VALUES ('id_base', ?);", (secrets.randbits(63),)
+                    )
+                fila = self._conn.execute("SELECT valor FROM snapshot_meta WHERE clave = 'id_base';").fetchone()
+            self._id_base = fila[0]
+            fila = self._conn.execute("SELECT valor FROM snapshot_meta WHERE clave = 'seq';").fetchone()
+            if fila is None:
+                # Base sin snapshot (nueva o anterior al registro): el estado actual es el punto de partida
+                self.compactar()
+            else:
+                self._seq_snapshot = fila[0]
     
-        def _cargar_cache_desde_db(self) -> None:
+        def _cargar_cache_desde_db(self, snapshot: Optional[Tuple[int, List[Producto]]] = None) -> None:
+            """
+            Llena la caché. Con `snapshot` = (seq, productos) parte de esos productos y
+            aplica solo los cambios posteriores a seq; si esos cambios ya se
+            compactaron, vuelve a leer la tabla completa.
+            """
+            self._cache = {}
+            self._nombres = set()
+            if snapshot is not None:
+                seq, productos = snapshot
+                try:
+                    cambios = self.cambios_desde(seq)
+                except CambiosCompactados:
+                    pass
+                else:
+                    for p in productos:
+                        self._cache[p.id] = p
+                        self._nombres.add(p.nombre.lower())
+                    for cambio in cambios:
+                        self._aplicar_cambio(cambio)
+                    return
             cur = self._conn.execute("SELECT id, nombre, cantidad, precio FROM productos;")
             filas: List[Tuple[int, str, int, float]] = cur.fetchall()
             for (pid, nombre, cantidad, precio) in filas:
@@ -104,6 +464,138 @@ code = dedent('''
                 self._cache[pid] = p
                 self._nombres.add(nombre.lower())
     
+        def _cargar_cache_desde_archivo(self, ruta: str) -> bool:
+            """
+            Mapea el snapshot binario y lo pone al día con el registro de cambios.
+            Devuelve False (y no toca la caché) si falta, es inválido, es de otra
+            base (id_base distinto), es más nuevo que la base o sus cambios
+            pendientes ya se compactaron.
+            """
+            try:
+                archivo = ArchivoCache(ruta)
+            except (OSError, ValueError):
+                return False
+            try:
+                if archivo.id_base != self._id_base:
+                    raise CambiosCompactados("El archivo de caché es de otra base.")
+                if archivo.seq > self._seq:
+                    raise CambiosCompactados("El archivo de caché es más nuevo que la base.")
+                cambios = self.cambios_desde(archivo.seq)
+            except CambiosCompactados:
+                archivo.cerrar()
+                return False
+            self._archivo = archivo
+            self._seq_archivo = archivo.seq
+            self._cache = ProductosMapeados(archivo)
+            self._nombres = NombresMapeados(archivo)
+            for cambio in cambios:
+                self._aplicar_cambio(cambio)
+            return True
+    
+        def _soltar_archivo(self) -> None:
+            if self._archivo is not None:
+                self._cache = {}
+                self._nombres = set()
+                self._archivo.cerrar()
+                self._archivo = None
+    
+        def guardar_cache(self, ruta: Optional[str] = None) -> None:
+            """
+            Escribe el snapshot binario del estado actual (leído de SQLite, sin
+            crear objetos). En Windows no se puede reemplazar el archivo que está
+            mapeado: ahí se guarda solo en cerrar().
+            """
+            ruta = ruta or self.archivo_cache
+            if not ruta:
+                raise ValueError("No se indicó archivo de caché.")
+            # Filas y seq de la misma versión de la base (puede haber escrituras de otros procesos)
+            with self._lectura_consistente():
+                filas = self._conn.execute("SELECT id, nombre, cantidad, precio FROM productos ORDER BY id;").fetchall()
+                seq = self._ultimo_seq()
+            escribir_archivo_cache(ruta, self._id_base, seq, filas)
+            if ruta == self.archivo_cache:
+                self._seq_archivo = seq
+    
+        def _aplicar_cambio(self, cambio: Cambio) -> None:
+            anterior = self._cache.pop(cambio.producto_id, None)
+            if anterior is not None:
+                self._nombres.discard(anterior.nombre.lower())
+            nuevo = cambio.producto()
+            if nuevo is not None:
+                self._cache[nuevo.id] = nuevo
+                self._nombres.add(nuevo.nombre.lower())
+    
+        # --- Registro de cambios (CDC) ---
+        def _ultimo_seq(self) -> int:
+            # Llamar dentro de la transacción del cambio (los triggers ya escribieron el
+            # registro); el valor solo se guarda en self._seq cuando la transacción confirma.
+            fila = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'cambios';").fetchone()
+            return max(self._seq, fila[0] if fila is not None else 0)
+    
+        def _compactar_si_hace_falta(self) -> None:
+            if self.limite_cambios is not None and self._seq - self._seq_snapshot > self.limite_cambios:
+                self.compactar()
+    
+        def ultima_secuencia(self) -> int:
+            return self._seq
+    
+        @contextmanager
+        def _lectura_consistente(self) -> Iterator[None]:
+            """Varias consultas dentro de una transacción de lectura: ven la misma versión de la base."""
+            if self._conn.in_transaction:
+                yield
+                return
+            self._conn.execute("BEGIN;")
+            try:
+                yield
+            finally:
+                self._conn.commit()
+    
+        def cambios_desde(self, seq: int, limite: Optional[int] = None) -> List[Cambio]:
+            """
+            Cambios con número de secuencia mayor que `seq`, en orden. Lanza
+            CambiosCompactados si parte de ellos ya se recortó del registro.
+            """
+            sql = "SELECT seq, operacion, producto_id, nombre, cantidad, precio FROM cambios WHERE seq > ? ORDER BY seq"
+            parametros: Tuple = (seq,)
+            if limite is not None:
+                sql += " LIMIT ?"
+                parametros = (seq, limite)
+            # El seq del snapshot y los cambios en la misma transacción: una compactación
+            # de otra conexión entre ambas lecturas dejaría un hueco sin avisar
+            with self._lectura_consistente():
+                fila = self._conn.execute("SELECT valor FROM snapshot_meta WHERE clave = 'seq';").fetchone()
+                if fila is not None and seq < fila[0]:
+                    raise CambiosCompactados(f"Los cambios hasta {fila[0]} se compactaron (pedido desde {seq}).")
+                return [Cambio(*fila) for fila in self._conn.execute(sql + ";", parametros).fetchall()]
+    
+        def leer_snapshot(self) -> Tuple[int, List[Producto]]:
+            """Último snapshot guardado: (seq, productos). Luego aplicar cambios_desde(seq)."""
+            with self._lectura_consistente():
+                seq = self._conn.execute("SELECT valor FROM snapshot_meta WHERE clave = 'seq';").fetchone()[0]
+                cur = self._conn.execute("SELECT id, nombre, cantidad, precio FROM snapshot_productos ORDER BY id;")
+                return seq, [Producto(*fila) for fila in cur.fetchall()]
+    
+        def compactar(self) -> int:
+            """
+            Copia el estado actual de productos a snapshot_productos con el seq actual
+            y borra del registro los cambios ya incluidos. Devuelve el seq del snapshot.
+            """
+            with self._conn:
+                fila = self._conn.execute("SELECT valor FROM snapshot_meta WHERE clave = 'seq';").fetchone()
+                # El seq del snapshot nunca retrocede: los consumidores que pidan cambios
+                # anteriores deben recibir CambiosCompactados, no una lista vacía
+                seq = max(self._seq, fila[0] if fila is not None else 0)
+                self._conn.execute("DELETE FROM snapshot_productos;")
+                self._conn.execute(
+                    "INSERT INTO snapshot_productos (id, nombre, cantidad, precio) "
+                    "SELECT id, nombre, cantidad, precio FROM productos;"
+                )
+                self._conn.execute("INSERT OR REPLACE INTO snapshot_meta (clave, valor) VALUES ('seq', ?);", (seq,))
+                self._conn.execute("DELETE FROM cambios WHERE seq <= ?;", (seq,))
+            self._seq = self._seq_snapshot = seq
+            return seq
+    
         # --- CRUD ---
         def anadir_producto(self, producto: Producto) -> None:
             # Validaciones básicas
@@ -119,9 +611,12 @@ code = dedent('''
                     "INSERT INTO productos (id, nombre, cantidad, precio) VALUES (?, ?, ?, ?);",
                     (producto.id, producto.nombre, producto.cantidad, producto.precio),
                 )
+                seq = self._ultimo_seq()
+            self._seq = seq
             # Actualizar colecciones en memoria
             self._cache[producto.id] = producto
             self._nombres.add(producto.nombre.lower())
+            self._compactar_si_hace_falta()
     
         def eliminar_por_id(self, product_id: int) -> bool:
             if product_id not in self._cache:
@@ -129,11 +624,14 @@ code = dedent('''
             nombre_borrar = self._cache[product_id].nombre.lower()
             with self._conn:
                 self._conn.execute("DELETE FROM productos WHERE id = ?;", (product_id,))
+                seq = self._ultimo_seq()
+            self._seq = seq
             # Actualizar colecciones
             del self._cache[product_id]
             # Solo quitar el nombre si no hay otro con el mismo (no debería por UNIQUE)
             if nombre_borrar in self._nombres:
                 self._nombres.remove(nombre_borrar)
+            self._compactar_si_hace_falta()
             return True
     
         def actualizar_cantidad(self, product_id: int, nueva_cantidad: int) -> bool:
@@ -146,9 +644,33 @@ code = dedent('''
                     "UPDATE productos SET cantidad = ? WHERE id = ?;",
                     (nueva_cantidad, product_id),
                 )
+                seq = self._ultimo_seq()
+            self._seq = seq
             self._cache[product_id].set_cantidad(nueva_cantidad)
+            self._compactar_si_hace_falta()
             return True
     
+        def actualizar_cantidades(self, cambios: Dict[int, int]) -> None:
+            """
+            Actualiza varias cantidades en una sola transacción (id -> nueva cantidad).
+            Se valida todo antes de escribir: o se aplican todos los cambios o ninguno.
+            """
+            for product_id, nueva_cantidad in cambios.items():
+                if product_id not in self._cache:
+                    raise KeyError(f"No existe un producto con ID {product_id}.")
+                if nueva_cantidad < 0:
+                    raise ValueError("La cantidad no puede ser negativa.")
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE productos SET cantidad = ? WHERE id = ?;",
+                    [(cantidad, pid) for pid, cantidad in cambios.items()],
+                )
+                seq = self._ultimo_seq()
+            self._seq = seq
+            for product_id, nueva_cantidad in cambios.items():
+                self._cache[product_id].set_cantidad(nueva_cantidad)
+            self._compactar_si_hace_falta()
+    
         def actualizar_precio(self, product_id: int, nuevo_precio: float) -> bool:
             if product_id not in self._cache:
                 return False
@@ -159,7 +681,10 @@ code = dedent('''
                     "UPDATE productos SET precio = ? WHERE id = ?;",
                     (nuevo_precio, product_id),
                 )
+                seq = self._ultimo_seq()
+            self._seq = seq
             self._cache[product_id].set_precio(nuevo_precio)
+            self._compactar_si_hace_falta()
             return True
     
         def buscar_por_nombre(self, termino: str) -> List[Producto]:
@@ -175,11 +700,19 @@ code = dedent('''
             resultados = [Producto(pid, nom, cant, prec) for pid, nom, cant, prec in cur.fetchall()]
             return resultados
     
+        def obtener_por_id(self, product_id: int) -> Optional[Producto]:
+            # Búsqueda O(1) en la caché
+            return self._cache.get(product_id)
+    
         def mostrar_todos(self) -> List[Producto]:
             # Devolvemos una lista ordenada por id desde la caché
             return [self._cache[k] for k in sorted(self._cache.keys())]
     
         def cerrar(self) -> None:
+            # Soltar el mapeo antes de reemplazar el archivo (necesario en Windows)
+            self._soltar_archivo()
+            if self.archivo_cache and self._seq_archivo != self._seq:
+                self.guardar_cache()
             self._conn.close()
     
     
@@ -352,6 +885,8 @@ readme = dedent('''
     ## Estructura del Código
     - `Producto`: modelo con getters/setters para cumplir el requisito explícito y `__str__` para impresión bonita.
     - `Inventario`: servicio/repositorio que expone métodos CRUD y maneja sincronización entre DB y caché.
+    - `Cambio`: entrada del registro de cambios (seq, operación y fila resultante).
+    - `InventarioSucursales`: fachada que reparte los productos entre varias bases (una por sucursal).
     - `main()`: menú y validaciones de entrada.
     
     ## Pruebas Manuales Sugeridas
@@ -361,11 +896,96 @@ readme = dedent('''
     4. Buscar por subcadena del nombre (p. ej., "clav").
     5. Eliminar por ID y verificar que desaparece.
     
+    ## Pruebas automáticas
+    `test_inventario.py` (con `pytest`) cubre el registro de cambios tras compactar, el arranque desde el archivo de caché, la validación de `POST /productos` y el enrutamiento por ubicación de `InventarioSucursales` (también tras reiniciar):
+    ```bash
+    python -m pytest test_inventario.py
+    ```
+    
     ## Subir a GitHub
     1. Crea un repositorio nuevo (p. ej., `inventario-sqlite-poo`).
-    2. Sube los archivos `inventario_sqlite.py`, `inventario.db` (opcional; se recrea solo), y `README.md`.
+    2. Sube los archivos `inventario_sqlite.py`, `inventario_api.py`, `bench_arranque.py`, `inventario_sucursales.py`, `test_inventario.py`, `inventario.db` (opcional; se recrea solo), y `README.md`.
     3. Copia el enlace del repositorio en Moodle.
     
+    ## Registro de cambios (CDC) y snapshots
+    Cada alta, baja o actualización escribe, en la misma transacción, una fila en la tabla `cambios` con un número de secuencia creciente y la fila completa del producto tras el cambio. La escriben triggers de SQLite, así que también quedan registradas las escrituras hechas sin pasar por `Inventario` (otro programa, `sqlite3` a mano, una carga masiva). Un consumidor (web, reporte, réplica) no necesita recargar toda la tabla:
+    ```python
+    seq, productos = inv.leer_snapshot()      # punto de partida
+    for c in inv.cambios_desde(seq):          # después, solo lo nuevo
+        print(c.seq, c.operacion, c.producto())
+    ```
+    - `compactar()` copia `productos` a `snapshot_productos`, guarda su seq y borra del registro los cambios ya incluidos. Con `Inventario(limite_cambios=10000)` se compacta solo al superar ese número de cambios.
+    - Si un consumidor pide cambios que ya se compactaron, `cambios_desde` lanza `CambiosCompactados` (la API responde `410`): hay que volver a partir de `leer_snapshot()`.
+    - `Inventario(snapshot=(seq, productos))` llena la caché desde ese snapshot aplicando solo los cambios posteriores, y recurre a la tabla completa si ya no están.
+    - En la API: `GET /cambios?desde=<seq>` y `GET /snapshot`, ambos en NDJSON.
+    
+    ## Arranque rápido con archivo de caché
+    Con muchos productos, llenar el `dict` al arrancar lleva segundos y cientos de MB. `Inventario(archivo_cache="inventario.cache")` guarda al cerrar un snapshot binario (ids ordenados, cantidades, precios y nombres en arreglos contiguos) que el siguiente arranque mapea en memoria con `mmap`: no se recorre la tabla ni se crean objetos, y el sistema operativo trae del disco solo las páginas que se consultan.
+    - Las búsquedas por ID usan búsqueda binaria sobre el arreglo de ids; altas, bajas y cambios se guardan en una capa en memoria encima del archivo.
+    - El archivo lleva el `seq` del registro de cambios con el que se escribió y el identificador aleatorio de la base (`snapshot_meta.id_base`). Si la base avanzó (otro proceso la modificó), al abrir se aplican solo `cambios_desde(seq)`; si esos cambios ya se compactaron, el archivo es de otra base (otro identificador) o está dañado, se carga desde SQLite como siempre.
+    - `cerrar()` lo reescribe solo si hubo cambios (a un `.tmp` y luego `os.replace`, así nunca queda a medias). `guardar_cache()` lo escribe en cualquier momento.
+    
+    Medición con `python bench_arranque.py` (1.000.000 de productos, contenedor Linux de 1 vCPU, Python 3.11; cada arranque en un proceso nuevo):
+    
+    | arranque | hasta la 1.ª consulta | 1000 consultas por ID | RSS pico |
+    |---|---:|---:|---:|
+    | SQLite (sin archivo) | 4,76 s | 0,86 ms | 511 MB |
+    | Archivo mapeado | 0,001 s | 3,60 ms | 63 MB |
+    | Archivo mapeado + 1000 cambios pendientes | 0,036 s | 4,13 ms | 71 MB |
+    
+    El archivo ocupa 56 MB y `guardar_cache()` tardó 4,2 s. Cada consulta sobre el archivo crea el `Producto` en el momento (unos 4 µs frente a 1 µs del `dict`), a cambio de no pagar la carga completa al arrancar.
+    
+    ## Varias sucursales (`inventario_sucursales.py`)
+    Con todas las tiendas en un mismo `inventario.db`, SQLite permite un solo escritor a la vez. `InventarioSucursales` usa un archivo por sucursal con la misma interfaz que `Inventario`:
+    ```python
+    from inventario_sucursales import InventarioSucursales
+    inv = InventarioSucursales({"centro": "centro.db", "norte": "norte.db", "sur": "sur.db"})
+    inv.anadir_producto(Producto(1, "Martillo", 10, 12.5))   # va a la sucursal id % 3
+    inv.buscar_por_nombre("mart")     # [(sucursal, Producto), ...] ordenado por nombre
+    inv.valorizacion()                # {"centro": Valorizacion(productos, unidades, valor), ...}
+    inv.valorizacion_total()
+    ```
+    - **Reparto**: por ID (`enrutar="id"`, `id % número de sucursales`; el orden de las sucursales no debe cambiar) o por ubicación (`enrutar="ubicacion"` e `inv.anadir_producto(p, sucursal="norte")`); un mapa id → sucursal, cargado al arrancar, evita preguntar a las demás sucursales en cada escritura). Los ID son únicos en todo el inventario; los nombres, dentro de cada sucursal.
+    - **Escrituras**: cada sucursal tiene su `Inventario` y un hilo propio que es el único que usa su conexión. Las escrituras de sucursales distintas no se esperan entre sí. `actualizar_cantidades` escribe una transacción por sucursal (no es atómico entre sucursales).
+    - **Consultas globales**: la búsqueda y la valorización (`SUM(cantidad * precio)`) se ejecutan a la vez en todas las sucursales, con conexiones de solo lectura (WAL), en un pool de hilos o de procesos (`paralelo="procesos"`). Los resultados ya vienen ordenados de cada base y se intercalan con `heapq.merge`.
+    - `archivos_cache=True` activa en cada sucursal el archivo de caché (`<sucursal>.db.cache`).
+    
+    Comparación con `python inventario_sucursales.py` (200.000 productos, 4 sucursales, 8 hilos escribiendo; contenedor Linux de 1 vCPU, Python 3.11):
+    
+    | | búsqueda "producto 12" | valorización | escrituras/s |
+    |---|---:|---:|---:|
+    | 1 archivo | 87–94 ms | 25–32 ms | 3200–3500 |
+    | 4 sucursales, hilos | 110–159 ms | 27–29 ms | 4650–5480 |
+    | 4 sucursales, procesos | 110–113 ms | 27–28 ms | 3840–4640 |
+    
+    Las escrituras rinden 1,4–1,7 veces más porque cada sucursal hace su commit sin esperar a las demás. Con una sola CPU las consultas en paralelo no pueden ir más rápido que una sola consulta; en este caso la búsqueda es algo más lenta por abrir una conexión por sucursal e intercalar los resultados. Con varios núcleos, cada sucursal se consulta en el suyo (SQLite suelta el GIL mientras ejecuta la consulta).
+    
+    ## API HTTP asíncrona (`inventario_api.py`)
+    Expone el mismo `Inventario` por HTTP usando solo `asyncio` y `sqlite3`:
+    ```bash
+    python inventario_api.py servir --db inventario.db --puerto 8080
+    curl http://127.0.0.1:8080/productos            # NDJSON en streaming
+    curl -X POST http://127.0.0.1:8080/productos/1/ajuste -d '{"delta": -2}'
+    ```
+    - **Un escritor, varios lectores**: un único hilo es dueño de `Inventario` y de su conexión (todas las escrituras pasan por él); las lecturas usan un pool de conexiones de solo lectura en modo WAL, así nunca se comparte una conexión entre hilos.
+    - **Ajustes agrupados**: los `POST /productos/<id>/ajuste` que llegan a la vez se aplican en una sola transacción (`actualizar_cantidades`); cada cliente recibe su cantidad resultante o su propio error (stock insuficiente).
+    - **Listado NDJSON**: `GET /productos` (y `?q=` para buscar) envía un producto por línea, leyendo de SQLite por lotes de 500.
+    
+    Prueba de carga (50% lecturas, 40% ajustes, 10% búsquedas; comprueba que no haya errores 5xx y que el stock final cuadre):
+    ```bash
+    python inventario_api.py carga --clientes 1 8 32 128
+    ```
+    Resultado en un contenedor Linux de 1 vCPU (Python 3.11, 200 peticiones por cliente):
+    
+    | clientes | peticiones/s | transacciones de ajuste | errores | stock |
+    |---------:|-------------:|------------------------:|--------:|:-----:|
+    | 1        | 623          | 80                      | 0       | OK    |
+    | 8        | 2434         | 123                     | 0       | OK    |
+    | 32       | 3209         | 532                     | 0       | OK    |
+    | 128      | 2806         | 2102                    | 0       | OK    |
+    
+    Con 128 clientes, 10240 ajustes se escribieron en 2102 transacciones gracias a la agrupación.
+    
     ## Extensiones Opcionales
     - Exportar/Importar a CSV.
     - Reportes (total de items, valor total de inventario).
@@ -374,10 +994,1250 @@ readme = dedent('''
     - Renderizar una versión web simple con `Flask` o `FastAPI` (Opcional "Render").
 ''')
 
+api = dedent('''
+    """
+    API HTTP asíncrona sobre Inventario (solo librería estándar: asyncio + sqlite3)
+    
+    - Un único hilo escritor es dueño del objeto Inventario (y de su conexión SQLite):
+      todas las altas, bajas y actualizaciones pasan por él, en orden.
+    - Varios hilos lectores con conexiones de solo lectura (modo WAL) atienden
+      consultas y listados sin esperar al escritor.
+    - Los ajustes de stock que llegan casi a la vez se agrupan y se escriben en una
+      sola transacción (actualizar_cantidades).
+    - GET /productos devuelve NDJSON (un JSON por línea) en streaming, por lotes.
+    
+    Rutas:
+        GET    /productos                 listado NDJSON (opcional ?q=texto para buscar por nombre)
+        GET    /productos/<id>            un producto
+        POST   /productos                 {"id", "nombre", "cantidad", "precio"}
+        DELETE /productos/<id>
+        PUT    /productos/<id>/cantidad   {"cantidad": 10}
+        PUT    /productos/<id>/precio     {"precio": 4.5}
+        POST   /productos/<id>/ajuste     {"delta": -3}   (agrupado con otros ajustes)
+        GET    /cambios?desde=<seq>       cambios posteriores a seq en NDJSON (410 si ya se compactaron)
+        GET    /snapshot                  NDJSON: {"seq": N} y después los productos del snapshot
+    
+    Uso:
+        python inventario_api.py servir --db inventario.db --puerto 8080
+        python inventario_api.py carga --clientes 1 8 32 128
+    """
+    from __future__ import annotations
+    import argparse
+    import asyncio
+    import http.client
+    import json
+    import math
+    import os
+    import re
+    import sqlite3
+    import tempfile
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from dataclasses import asdict
+    from pathlib import Path
+    from typing import Any, Dict, List, Optional, Tuple
+    from urllib.parse import parse_qs, urlsplit
+    
+    from inventario_sqlite import Cambio, Inventario, Producto
+    
+    TAMANO_LOTE_LISTADO = 500
+    RAZONES = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 409: "Conflict", 410: "Gone", 500: "Internal Server Error"}
+    
+    
+    class ErrorHTTP(Exception):
+        def __init__(self, estado: int, mensaje: str) -> None:
+            super().__init__(mensaje)
+            self.estado = estado
+    
+    
+    # ----------------------------
+    # Acceso a SQLite: un escritor, varios lectores
+    # ----------------------------
+    class AccesoInventario:
+        """Reparte el trabajo SQLite entre un hilo escritor y un pool de lectores."""
+    
+        def __init__(self, ruta_db: str, lectores: int = 4) -> None:
+            self.ruta_db = ruta_db
+            self._escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inventario-escritor")
+            # El Inventario se crea dentro del hilo escritor: su conexión solo se usa allí
+            self.inventario: Inventario = self._escritor.submit(Inventario, ruta_db, True).result()
+            self._lectores = ThreadPoolExecutor(max_workers=lectores, thread_name_prefix="inventario-lector")
+            # Conexiones de solo lectura. Se reservan desde el event loop (sin ocupar
+            # un hilo esperando) y cada una la usa un único hilo a la vez.
+            self._conexiones: "asyncio.Queue[sqlite3.Connection]" = asyncio.Queue()
+            uri = Path(ruta_db).resolve().as_uri() + "?mode=ro"
+            for _ in range(lectores):
+                self._conexiones.put_nowait(sqlite3.connect(uri, uri=True, check_same_thread=False))
+    
+        async def escribir(self, funcion, *args):
+            return await asyncio.get_running_loop().run_in_executor(self._escritor, funcion, *args)
+    
+        async def leer(self, sql: str, parametros: Tuple = ()) -> List[Tuple]:
+            con = await self._conexiones.get()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._lectores, lambda: con.execute(sql, parametros).fetchall()
+                )
+            finally:
+                self._conexiones.put_nowait(con)
+    
+        async def leer_por_lotes(
+            self, sql: str, parametros: Tuple = (), tamano: int = TAMANO_LOTE_LISTADO, previa: Optional[str] = None
+        ):
+            """
+            Generador asíncrono de lotes de filas; la conexión queda reservada mientras dura.
+            Con `previa`, el primer elemento son todas las filas de esa consulta, y ambas
+            se leen en la misma transacción (la misma versión de la base).
+            """
+            loop = asyncio.get_running_loop()
+            con = await self._conexiones.get()
+            try:
+                if previa is not None:
+                    await loop.run_in_executor(self._lectores, con.execute, "BEGIN;")
+                    yield await loop.run_in_executor(self._lectores, lambda: con.execute(previa).fetchall())
+                cursor = await loop.run_in_executor(self._lectores, con.execute, sql, parametros)
+                while True:
+                    lote = await loop.run_in_executor(self._lectores, cursor.fetchmany, tamano)
+                    if not lote:
+                        break
+                    yield lote
+                await loop.run_in_executor(self._lectores, cursor.close)
+            finally:
+                if con.in_transaction:
+                    await loop.run_in_executor(self._lectores, con.rollback)
+                self._conexiones.put_nowait(con)
+    
+        def cerrar(self) -> None:
+            self._lectores.shutdown(wait=True)
+            while not self._conexiones.empty():
+                self._conexiones.get_nowait().close()
+            self._escritor.submit(self.inventario.cerrar).result()
+            self._escritor.shutdown(wait=True)
+    
+    
+    # ----------------------------
+    # Agrupación de ajustes de stock
+    # ----------------------------
+    class AgrupadorAjustes:
+        """
+        Junta los ajustes (id, delta) que llegan mientras se espera `espera`
+        segundos o mientras el escritor está ocupado, y los aplica en una sola
+        transacción. Cada petición recibe la cantidad resultante tras su ajuste,
+        o su propio error si ese ajuste dejaría el stock en negativo.
+        """
+    
+        def __init__(self, acceso: AccesoInventario, espera: float = 0.002, maximo: int = 1000) -> None:
+            self._acceso = acceso
+            self._espera = espera
+            self._maximo = maximo
+            self._pendientes: List[Tuple[int, int, asyncio.Future]] = []
+            self._tarea: Optional[asyncio.Task] = None
+            self.lotes = 0
+    
+        async def ajustar(self, product_id: int, delta: int) -> int:
+            futuro = asyncio.get_running_loop().create_future()
+            self._pendientes.append((product_id, delta, futuro))
+            if self._tarea is None:
+                self._tarea = asyncio.ensure_future(self._vaciar())
+            return await futuro
+    
+        async def _vaciar(self) -> None:
+            await asyncio.sleep(self._espera)
+            while self._pendientes:
+                lote = self._pendientes[:self._maximo]
+                self._pendientes = self._pendientes[self._maximo:]
+                ajustes = [(pid, delta) for pid, delta, _ in lote]
+                try:
+                    resultados = await self._acceso.escribir(self._aplicar, ajustes)
+                except Exception as e:
+                    resultados = [e] * len(lote)
+                self.lotes += 1
+                for (_, _, futuro), resultado in zip(lote, resultados):
+                    if futuro.done():  # el cliente se desconectó
+                        continue
+                    if isinstance(resultado, Exception):
+                        futuro.set_exception(resultado)
+                    else:
+                        futuro.set_result(resultado)
+            self._tarea = None
+    
+        def _aplicar(self, ajustes: List[Tuple[int, int]]) -> List[Any]:
+            # Corre en el hilo escritor
+            inv = self._acceso.inventario
+            nuevas: Dict[int, int] = {}
+            resultados: List[Any] = []
+            for pid, delta in ajustes:
+                actual = nuevas.get(pid)
+                if actual is None:
+                    producto = inv.obtener_por_id(pid)
+                    if producto is None:
+                        resultados.append(ErrorHTTP(404, f"No existe un producto con ID {pid}."))
+                        continue
+                    actual = producto.get_cantidad()
+                if actual + delta < 0:
+                    resultados.append(ErrorHTTP(409, f"Stock insuficiente para el producto {pid} ({actual})."))
+                    continue
+                nuevas[pid] = actual + delta
+                resultados.append(nuevas[pid])
+            if nuevas:
+                inv.actualizar_cantidades(nuevas)
+            return resultados
+    
+    
+    # ----------------------------
+    # Servidor HTTP mínimo (HTTP/1.1 con keep-alive)
+    # ----------------------------
+    def _fila_a_dict(fila: Tuple) -> Dict[str, Any]:
+        pid, nombre, cantidad, precio = fila
+        return {"id": pid, "nombre": nombre, "cantidad": cantidad, "precio": precio}
+    
+    
+    def _leer_json(cuerpo: bytes) -> Dict[str, Any]:
+        try:
+            datos = json.loads(cuerpo or b"{}")
+        except ValueError:
+            raise ErrorHTTP(400, "JSON inválido.") from None
+        if not isinstance(datos, dict):
+            raise ErrorHTTP(400, "Se esperaba un objeto JSON.")
+        return datos
+    
+    
+    def _campo(datos: Dict[str, Any], nombre: str, tipo):
+        # Sin conversiones: tipo(valor) aceptaría null como "None", true como 1 o truncaría 1.9
+        valor = datos.get(nombre)
+        if tipo is str:
+            valido = isinstance(valor, str) and bool(valor.strip())
+        elif tipo is float:
+            valido = isinstance(valor, (int, float)) and not isinstance(valor, bool) and math.isfinite(valor)
+        else:
+            valido = isinstance(valor, int) and not isinstance(valor, bool)
+        if not valido:
+            raise ErrorHTTP(400, f"Falta o es inválido el campo '{nombre}'.")
+        return tipo(valor)
+    
+    
+    class ServidorInventario:
+        SELECT = "SELECT id, nombre, cantidad, precio FROM productos"
+        SQL_SEQ_SNAPSHOT = "SELECT valor FROM snapshot_meta WHERE clave = 'seq';"
+    
+        def __init__(self, ruta_db: str, lectores: int = 4) -> None:
+            self.acceso = AccesoInventario(ruta_db, lectores)
+            self.agrupador = AgrupadorAjustes(self.acceso)
+            self.puerto: Optional[int] = None
+            self._loop: Optional[asyncio.AbstractEventLoop] = None
+            self._tarea: Optional[asyncio.Task] = None
+            self._rutas = [
+                ("GET", re.compile(r"^/productos$"), self.listar),
+                ("POST", re.compile(r"^/productos$"), self.crear),
+                ("GET", re.compile(r"^/productos/(\\d+)$"), self.obtener),
+                ("DELETE", re.compile(r"^/productos/(\\d+)$"), self.eliminar),
+                ("PUT", re.compile(r"^/productos/(\\d+)/cantidad$"), self.cambiar_cantidad),
+                ("PUT", re.compile(r"^/productos/(\\d+)/precio$"), self.cambiar_precio),
+                ("POST", re.compile(r"^/productos/(\\d+)/ajuste$"), self.ajustar),
+                ("GET", re.compile(r"^/cambios$"), self.cambios),
+                ("GET", re.compile(r"^/snapshot$"), self.snapshot),
+            ]
+    
+        # --- Manejadores: devuelven (estado, cuerpo) o escriben en streaming ---
+        async def listar(self, consulta, cuerpo, escritor):
+            termino = consulta.get("q", [""])[0]
+            if termino:
+                sql = self.SELECT + " WHERE lower(nombre) LIKE ? ORDER BY nombre;"
+                parametros: Tuple = (f"%{termino.lower()}%",)
+            else:
+                sql, parametros = self.SELECT + " ORDER BY id;", ()
+            await self._enviar_ndjson(escritor, self.acceso.leer_por_lotes(sql, parametros), _fila_a_dict)
+            return None
+    
+        async def cambios(self, consulta, cuerpo, escritor):
+            try:
+                desde = int(consulta.get("desde", ["0"])[0])
+            except ValueError:
+                raise ErrorHTTP(400, "'desde' debe ser un entero.") from None
+            sql = "SELECT seq, operacion, producto_id, nombre, cantidad, precio FROM cambios WHERE seq > ? ORDER BY seq;"
+            # seq del snapshot y cambios en la misma transacción: sin huecos si se compacta entre medio
+            lotes = self.acceso.leer_por_lotes(sql, (desde,), previa=self.SQL_SEQ_SNAPSHOT)
+            filas = await anext(lotes)
+            seq_snapshot = filas[0][0] if filas else 0
+            if desde < seq_snapshot:
+                await lotes.aclose()
+                # El cliente debe recargar desde /snapshot y seguir desde su seq
+                await self._responder(escritor, 410, {"error": "Cambios compactados.", "seq_snapshot": seq_snapshot})
+                return None
+            await self._enviar_ndjson(escritor, lotes, lambda f: asdict(Cambio(*f)))
+            return None
+    
+        async def snapshot(self, consulta, cuerpo, escritor):
+            sql = "SELECT id, nombre, cantidad, precio FROM snapshot_productos ORDER BY id;"
+            lotes = self.acceso.leer_por_lotes(sql, previa=self.SQL_SEQ_SNAPSHOT)
+            filas = await anext(lotes)
+            await self._enviar_ndjson(escritor, lotes, _fila_a_dict, primera={"seq": filas[0][0] if filas else 0})
+            return None
+    
+        async def obtener(self, consulta, cuerpo, escritor, pid):
+            filas = await self.acceso.leer(self.SELECT + " WHERE id = ?;", (int(pid),))
+            if not filas:
+                raise ErrorHTTP(404, f"No existe un producto con ID {pid}.")
+            return 200, _fila_a_dict(filas[0])
+    
+        async def crear(self, consulta, cuerpo, escritor):
+            datos = _leer_json(cuerpo)
+            producto = Producto(
+                _campo(datos, "id", int), _campo(datos, "nombre", str),
+                _campo(datos, "cantidad", int), _campo(datos, "precio", float),
+            )
+            if producto.cantidad < 0 or producto.precio < 0:
+                raise ErrorHTTP(400, "Cantidad y precio deben ser no negativos.")
+            try:
+                await self.acceso.escribir(self.acceso.inventario.anadir_producto, producto)
+            except ValueError as e:
+                # Ya validado lo demás: solo queda un ID o nombre repetido
+                raise ErrorHTTP(409, str(e)) from None
+            return 201, asdict(producto)
+    
+        async def eliminar(self, consulta, cuerpo, escritor, pid):
+            if not await self.acceso.escribir(self.acceso.inventario.eliminar_por_id, int(pid)):
+                raise ErrorHTTP(404, f"No existe un producto con ID {pid}.")
+            return 204, None
+    
+        async def cambiar_cantidad(self, consulta, cuerpo, escritor, pid):
+            cantidad = _campo(_leer_json(cuerpo), "cantidad", int)
+            try:
+                ok = await self.acceso.escribir(self.acceso.inventario.actualizar_cantidad, int(pid), cantidad)
+            except ValueError as e:
+                raise ErrorHTTP(400, str(e)) from None
+            if not ok:
+                raise ErrorHTTP(404, f"No existe un producto con ID {pid}.")
+            return 200, {"id": int(pid), "cantidad": cantidad}
+    
+        async def cambiar_precio(self, consulta, cuerpo, escritor, pid):
+            precio = _campo(_leer_json(cuerpo), "precio", float)
+            try:
+                ok = await self.acceso.escribir(self.acceso.inventario.actualizar_precio, int(pid), precio)
+            except ValueError as e:
+                raise ErrorHTTP(400, str(e)) from None
+            if not ok:
+                raise ErrorHTTP(404, f"No existe un producto con ID {pid}.")
+            return 200, {"id": int(pid), "precio": precio}
+    
+        async def ajustar(self, consulta, cuerpo, escritor, pid):
+            delta = _campo(_leer_json(cuerpo), "delta", int)
+            cantidad = await self.agrupador.ajustar(int(pid), delta)
+            return 200, {"id": int(pid), "cantidad": cantidad}
+    
+        # --- Protocolo ---
+        async def _enviar_ndjson(self, escritor, lotes, convertir, primera: Optional[Dict[str, Any]] = None) -> None:
+            """Respuesta chunked con un objeto JSON por línea, un chunk por lote de filas."""
+            await self._cabecera(escritor, 200, "application/x-ndjson", {"Transfer-Encoding": "chunked"})
+            if primera is not None:
+                datos = (json.dumps(primera) + "\\n").encode("utf-8")
+                escritor.write(b"%x\\r\\n%s\\r\\n" % (len(datos), datos))
+            async for lote in lotes:
+                datos = "".join(json.dumps(convertir(f), ensure_ascii=False) + "\\n" for f in lote).encode("utf-8")
+                escritor.write(b"%x\\r\\n%s\\r\\n" % (len(datos), datos))
+                await escritor.drain()
+            escritor.write(b"0\\r\\n\\r\\n")
+    
+        async def _cabecera(self, escritor, estado: int, tipo: Optional[str], extra: Dict[str, str]) -> None:
+            lineas = [f"HTTP/1.1 {estado} {RAZONES.get(estado, '')}"]
+            if tipo:
+                lineas.append(f"Content-Type: {tipo}")
+            lineas.extend(f"{k}: {v}" for k, v in extra.items())
+            escritor.write(("\\r\\n".join(lineas) + "\\r\\n\\r\\n").encode("latin-1"))
+    
+        async def _responder(self, escritor, estado: int, datos) -> None:
+            cuerpo = b"" if datos is None else json.dumps(datos, ensure_ascii=False).encode("utf-8")
+            tipo = "application/json; charset=utf-8" if datos is not None else None
+            await self._cabecera(escritor, estado, tipo, {"Content-Length": str(len(cuerpo))})
+            escritor.write(cuerpo)
+    
+        async def _despachar(self, metodo: str, objetivo: str, cuerpo: bytes, escritor) -> None:
+            partes = urlsplit(objetivo)
+            consulta = parse_qs(partes.query)
+            metodo_valido = False
+            for metodo_ruta, patron, manejador in self._rutas:
+                coincidencia = patron.match(partes.path)
+                if not coincidencia:
+                    continue
+                if metodo_ruta != metodo:
+                    metodo_valido = True
+                    continue
+                try:
+                    resultado = await manejador(consulta, cuerpo, escritor, *coincidencia.groups())
+                except ErrorHTTP as e:
+                    await self._responder(escritor, e.estado, {"error": str(e)})
+                    return
+                except Exception as e:  # error inesperado: 500 sin tumbar la conexión
+                    await self._responder(escritor, 500, {"error": f"{type(e).__name__}: {e}"})
+                    return
+                if resultado is not None:
+                    await self._responder(escritor, *resultado)
+                return
+            if metodo_valido:
+                await self._responder(escritor, 405, {"error": "Método no permitido."})
+            else:
+                await self._responder(escritor, 404, {"error": "Ruta no encontrada."})
+    
+        async def atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+            try:
+                while True:
+                    linea = await lector.readline()
+                    if not linea:
+                        break
+                    metodo, objetivo, version = linea.decode("latin-1").split()
+                    cabeceras: Dict[str, str] = {}
+                    while True:
+                        h = await lector.readline()
+                        if h in (b"\\r\\n", b"\\n", b""):
+                            break
+                        clave, _, valor = h.decode("latin-1").partition(":")
+                        cabeceras[clave.strip().lower()] = valor.strip()
+                    cuerpo = await lector.readexactly(int(cabeceras.get("content-length", 0)))
+                    await self._despachar(metodo.upper(), objetivo, cuerpo, escritor)
+                    await escritor.drain()
+                    if version != "HTTP/1.1" or cabeceras.get("connection", "").lower() == "close":
+                        break
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                pass
+            except asyncio.CancelledError:
+                # Apagado del servidor con conexiones keep-alive abiertas: cerrar sin ruido
+                pass
+            finally:
+                escritor.close()
+    
+        async def servir(self, host: str = "127.0.0.1", puerto: int = 8080, listo: Optional[threading.Event] = None):
+            servidor = await asyncio.start_server(self.atender, host, puerto, backlog=1024)
+            self.puerto = servidor.sockets[0].getsockname()[1]
+            self._loop = asyncio.get_running_loop()
+            self._tarea = asyncio.current_task()
+            if listo is not None:
+                listo.set()
+            async with servidor:
+                await servidor.serve_forever()
+    
+        def servir_en_hilo(self, host: str = "127.0.0.1", puerto: int = 8080,
+                           listo: Optional[threading.Event] = None) -> None:
+            """Corre el event loop en el hilo actual hasta que se llame a detener()."""
+            try:
+                asyncio.run(self.servir(host, puerto, listo))
+            except asyncio.CancelledError:
+                pass
+    
+        def detener(self) -> None:
+            # Se puede llamar desde cualquier hilo
+            if self._tarea is not None:
+                self._loop.call_soon_threadsafe(self._tarea.cancel)
+    
+        def cerrar(self) -> None:
+            self.acceso.cerrar()
+    
+    
+    # ----------------------------
+    # Prueba de carga
+    # ----------------------------
+    def _ronda_de_carga(puerto: int, clientes: int, peticiones: int, productos: int) -> Tuple[float, int, Dict[int, int]]:
+        """Lanza `clientes` hilos; devuelve (peticiones/s, suma de deltas aceptados, errores por estado)."""
+        aceptados: List[int] = []
+        errores: Dict[int, int] = {}
+        lock = threading.Lock()
+    
+        def cliente(n: int) -> None:
+            con = http.client.HTTPConnection("127.0.0.1", puerto, timeout=30)
+            suma = 0
+            for i in range(peticiones):
+                pid = (n * 7919 + i * 31) % productos + 1
+                tipo = i % 10
+                delta = 0
+                if tipo < 5:
+                    con.request("GET", f"/productos/{pid}")
+                elif tipo < 9:
+                    delta = 2 if tipo == 5 else -1
+                    con.request("POST", f"/productos/{pid}/ajuste", body=json.dumps({"delta": delta}),
+                                headers={"Content-Type": "application/json"})
+                else:
+                    con.request("GET", "/productos?q=producto%2012")
+                resp = con.getresponse()
+                resp.read()
+                if resp.status >= 400:
+                    with lock:
+                        errores[resp.status] = errores.get(resp.status, 0) + 1
+                elif delta:
+                    suma += delta
+            con.close()
+            with lock:
+                aceptados.append(suma)
+    
+        inicio = time.perf_counter()
+        hilos = [threading.Thread(target=cliente, args=(n,)) for n in range(clientes)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        return clientes * peticiones / (time.perf_counter() - inicio), sum(aceptados), errores
+    
+    
+    def prueba_de_carga(clientes: List[int], peticiones: int = 200, productos: int = 1000, lectores: int = 4) -> bool:
+        """
+        Levanta la API sobre una base temporal y, para cada número de clientes,
+        lanza hilos que mezclan lecturas por id (50%), ajustes de stock (40%) y
+        búsquedas en streaming (10%). Comprueba que no hubo errores 5xx (p. ej.
+        sqlite3.ProgrammingError por usar una conexión desde otro hilo) y que el
+        stock total coincide con la suma de los ajustes aceptados.
+        """
+        ruta = os.path.join(tempfile.mkdtemp(), "carga.db")
+        Inventario(ruta).cerrar()  # crea la tabla
+        with sqlite3.connect(ruta) as con:
+            con.executemany(
+                "INSERT INTO productos (id, nombre, cantidad, precio) VALUES (?, ?, ?, ?);",
+                [(i, f"Producto {i}", 1000, 1.0) for i in range(1, productos + 1)],
+            )
+    
+        def stock_total() -> int:
+            with sqlite3.connect(ruta) as con:
+                return con.execute("SELECT SUM(cantidad) FROM productos;").fetchone()[0]
+    
+        servidor = ServidorInventario(ruta, lectores)
+        listo = threading.Event()
+        hilo = threading.Thread(target=servidor.servir_en_hilo, args=("127.0.0.1", 0, listo), daemon=True)
+        hilo.start()
+        listo.wait()
+    
+        correcto = True
+        print(f"{'clientes':>8} {'peticiones/s':>13} {'transacciones':>14} {'errores':>10}  stock")
+        try:
+            for n in clientes:
+                antes, lotes_antes = stock_total(), servidor.agrupador.lotes
+                rps, suma, errores = _ronda_de_carga(servidor.puerto, n, peticiones, productos)
+                consistente = stock_total() == antes + suma
+                sin_5xx = not any(estado >= 500 for estado in errores)
+                correcto = correcto and consistente and sin_5xx
+                print(f"{n:>8} {rps:>13.0f} {servidor.agrupador.lotes - lotes_antes:>14} "
+                      f"{sum(errores.values()):>10}  {'OK' if consistente else 'INCONSISTENTE'}")
+        finally:
+            servidor.detener()
+            hilo.join()
+            servidor.cerrar()
+        return correcto
+    
+    
+    def main() -> None:
+        parser = argparse.ArgumentParser(description="API HTTP asíncrona del inventario.")
+        sub = parser.add_subparsers(dest="comando", required=True)
+        servir = sub.add_parser("servir", help="sirve la API")
+        servir.add_argument("--db", default="inventario.db")
+        servir.add_argument("--host", default="127.0.0.1")
+        servir.add_argument("--puerto", type=int, default=8080)
+        servir.add_argument("--lectores", type=int, default=4)
+        carga = sub.add_parser("carga", help="prueba de carga sobre una base temporal")
+        carga.add_argument("--clientes", type=int, nargs="+", default=[1, 8, 32, 128])
+        carga.add_argument("--peticiones", type=int, default=200, help="peticiones por cliente")
+        carga.add_argument("--productos", type=int, default=1000)
+        carga.add_argument("--lectores", type=int, default=4)
+        args = parser.parse_args()
+    
+        if args.comando == "carga":
+            raise SystemExit(0 if prueba_de_carga(args.clientes, args.peticiones, args.productos, args.lectores) else 1)
+        servidor = ServidorInventario(args.db, args.lectores)
+        print(f"Sirviendo {args.db} en http://{args.host}:{args.puerto}")
+        try:
+            servidor.servir_en_hilo(args.host, args.puerto)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.cerrar()
+    
+    
+    if __name__ == "__main__":
+        main()
+''')
+
+bench = dedent('''
+    """
+    Mide el arranque de Inventario con muchas filas: carga completa desde SQLite
+    frente al snapshot binario mapeado en memoria (archivo_cache).
+    
+        python bench_arranque.py                  # 1.000.000 de productos
+        python bench_arranque.py --filas 200000 --cambios 5000
+    
+    Cada arranque se mide en un proceso nuevo (como un reinicio real) hasta
+    poder responder la primera consulta por ID; luego se cronometran 1000
+    búsquedas por ID al azar. La memoria es el pico de RSS del proceso.
+    """
+    from __future__ import annotations
+    import argparse
+    import json
+    import os
+    import random
+    import subprocess
+    import sys
+    import tempfile
+    import time
+    from typing import Dict, Optional
+    
+    from inventario_sqlite import Inventario
+    
+    BUSQUEDAS = 1000
+    
+    
+    def _rss_pico_mb() -> Optional[float]:
+        # VmHWM es el pico de este proceso; ru_maxrss en Linux conserva el del padre tras exec
+        try:
+            with open("/proc/self/status") as f:
+                for linea in f:
+                    if linea.startswith("VmHWM:"):
+                        return int(linea.split()[1]) / 1024
+        except OSError:
+            pass
+        try:
+            import resource
+        except ImportError:  # Windows
+            return None
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    
+    
+    def _medir(db: str, cache: Optional[str], filas: int) -> Dict:
+        inicio = time.perf_counter()
+        inv = Inventario(db, archivo_cache=cache)
+        inv.obtener_por_id(1)
+        listo = time.perf_counter() - inicio
+    
+        azar = random.Random(7)
+        ids = [azar.randint(1, filas) for _ in range(BUSQUEDAS)]
+        inicio = time.perf_counter()
+        for product_id in ids:
+            inv.obtener_por_id(product_id)
+        busquedas = time.perf_counter() - inicio
+        # Sin cerrar(): no se quiere reescribir el archivo durante la medición
+        return {
+            "modo": type(inv._cache).__name__,
+            "arranque_s": listo,
+            "busquedas_ms": busquedas * 1000,
+            "rss_mb": _rss_pico_mb(),
+        }
+    
+    
+    def _en_proceso_nuevo(db: str, cache: Optional[str], filas: int) -> Dict:
+        cmd = [sys.executable, os.path.abspath(__file__), "_medir", db, cache or "", str(filas)]
+        salida = subprocess.run(cmd, check=True, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        return json.loads(salida)
+    
+    
+    def poblar(db: str, filas: int) -> None:
+        inv = Inventario(db)
+        with inv._conn:
+            inv._conn.executemany(
+                "INSERT INTO productos(id, nombre, cantidad, precio) VALUES (?, ?, ?, ?);",
+                ((i, f"Producto {i:07d}", i % 500, round(1 + (i % 997) * 0.25, 2)) for i in range(1, filas + 1)),
+            )
+        inv.compactar()
+        inv.cerrar()
+    
+    
+    def main(argv=None) -> None:
+        parser = argparse.ArgumentParser(description="Arranque de Inventario: SQLite vs snapshot mapeado.")
+        parser.add_argument("--filas", type=int, default=1_000_000)
+        parser.add_argument("--cambios", type=int, default=1000, help="cambios a aplicar antes del último arranque")
+        parser.add_argument("--carpeta", default=None, help="carpeta de trabajo (por defecto una temporal)")
+        args = parser.parse_args(argv)
+    
+        carpeta = args.carpeta or tempfile.mkdtemp(prefix="bench_inventario_")
+        db = os.path.join(carpeta, "inventario.db")
+        cache = os.path.join(carpeta, "inventario.cache")
+        for ruta in (db, cache):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+    
+        inicio = time.perf_counter()
+        poblar(db, args.filas)
+        print(f"Base con {args.filas} productos creada en {time.perf_counter() - inicio:.1f} s ({db})")
+    
+        resultados = [("SQLite (sin archivo)", _en_proceso_nuevo(db, None, args.filas))]
+    
+        inv = Inventario(db)
+        inicio = time.perf_counter()
+        inv.guardar_cache(cache)
+        guardado = time.perf_counter() - inicio
+        inv.cerrar()
+        print(f"guardar_cache: {guardado:.2f} s, {os.path.getsize(cache) / 1e6:.1f} MB")
+    
+        resultados.append(("Archivo mapeado", _en_proceso_nuevo(db, cache, args.filas)))
+    
+        # Otro proceso (sin archivo) modifica la base: el archivo queda atrasado
+        inv = Inventario(db)
+        azar = random.Random(11)
+        for _ in range(args.cambios):
+            inv.actualizar_cantidad(azar.randint(1, args.filas), azar.randint(0, 500))
+        inv.cerrar()
+        resultados.append((f"Mapeado + {args.cambios} cambios", _en_proceso_nuevo(db, cache, args.filas)))
+    
+        print(f"\\n{'arranque':<26} {'caché':>18} {'hasta 1a consulta':>18} {BUSQUEDAS} por ID {'RSS pico':>9}")
+        for nombre, r in resultados:
+            rss = f"{r['rss_mb']:.0f} MB" if r["rss_mb"] is not None else "-"
+            print(f"{nombre:<26} {r['modo']:>18} {r['arranque_s']:>16.3f} s {r['busquedas_ms']:>10.2f} ms {rss:>9}")
+    
+    
+    if __name__ == "__main__":
+        if len(sys.argv) == 5 and sys.argv[1] == "_medir":
+            print(json.dumps(_medir(sys.argv[2], sys.argv[3] or None, int(sys.argv[4]))))
+        else:
+            main()
+''')
+
+sucursales = dedent('''
+    """
+    Inventario de varias sucursales: un archivo SQLite por sucursal detrás de una sola fachada.
+    
+    - Cada sucursal tiene su propio Inventario, creado dentro de un hilo que es el
+      único que usa su conexión. Las escrituras de sucursales distintas van en
+      paralelo (archivos y bloqueos distintos); las de una misma sucursal se
+      aplican en orden.
+    - Cada producto vive en una sucursal, elegida por ID (id % número de
+      sucursales) o por ubicación (la sucursal se indica al darlo de alta).
+    - Las búsquedas por nombre y la valorización del stock se lanzan a la vez en
+      todas las sucursales (pool de hilos o de procesos), cada una con su propia
+      conexión de solo lectura, y después se combinan los resultados.
+    
+    Uso:
+        inv = InventarioSucursales({"centro": "centro.db", "norte": "norte.db"})
+        inv.anadir_producto(Producto(1, "Martillo", 10, 12.5))
+        for sucursal, producto in inv.buscar_por_nombre("mart"):
+            print(sucursal, producto)
+        print(inv.valorizacion_total())
+    
+        python inventario_sucursales.py --sucursales 4 --filas 200000
+    """
+    from __future__ import annotations
+    import argparse
+    import heapq
+    import os
+    import random
+    import sqlite3
+    import tempfile
+    import threading
+    import time
+    from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+    from dataclasses import dataclass
+    from pathlib import Path
+    from typing import Callable, Dict, List, Optional, Tuple
+    
+    from inventario_sqlite import Inventario, Producto
+    
+    ENRUTAMIENTOS = ("id", "ubicacion")
+    PARALELISMOS = ("hilos", "procesos")
+    
+    SQL_BUSCAR = "SELECT id, nombre, cantidad, precio FROM productos WHERE lower(nombre) LIKE ? ORDER BY nombre;"
+    SQL_VALORIZAR = "SELECT COUNT(*), COALESCE(SUM(cantidad), 0), COALESCE(SUM(cantidad * precio), 0) FROM productos;"
+    
+    
+    @dataclass(frozen=True)
+    class Valorizacion:
+        productos: int
+        unidades: int
+        valor: float
+    
+        def __add__(self, otra: "Valorizacion") -> "Valorizacion":
+            return Valorizacion(self.productos + otra.productos, self.unidades + otra.unidades, self.valor + otra.valor)
+    
+    
+    def _consultar(ruta_db: str, sql: str, parametros: Tuple = ()) -> List[Tuple]:
+        """
+        Consulta de solo lectura con una conexión propia. Es una función de módulo
+        para que también pueda ejecutarse en un ProcessPoolExecutor.
+        """
+        uri = Path(ruta_db).resolve().as_uri() + "?mode=ro"
+        con = sqlite3.connect(uri, uri=True)
+        try:
+            return con.execute(sql, parametros).fetchall()
+        finally:
+            con.close()
+    
+    
+    # ----------------------------
+    # Una sucursal: su Inventario y el hilo dueño de su conexión
+    # ----------------------------
+    class Sucursal:
+        def __init__(self, nombre: str, ruta_db: str, **opciones) -> None:
+            self.nombre = nombre
+            self.ruta_db = ruta_db
+            self._hilo = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sucursal-{nombre}")
+            # Se abre en su hilo (WAL: los lectores no esperan al escritor); no se
+            # espera aquí para que todas las sucursales carguen su caché a la vez
+            self._inventario: Future = self._hilo.submit(lambda: Inventario(ruta_db, wal=True, **opciones))
+    
+        def esperar(self) -> Inventario:
+            return self._inventario.result()
+    
+        def ejecutar(self, metodo: str, *args) -> Future:
+            """Encola una llamada a un método del Inventario en el hilo de la sucursal."""
+            return self._hilo.submit(lambda: getattr(self._inventario.result(), metodo)(*args))
+    
+        def cerrar(self) -> None:
+            try:
+                self.ejecutar("cerrar").result()
+            finally:
+                self._hilo.shutdown()
+    
+    
+    # ----------------------------
+    # Fachada multi-sucursal
+    # ----------------------------
+    class InventarioSucursales:
+        """
+        Las escrituras y obtener_por_id de Inventario repartidas entre sucursales,
+        con estas diferencias de interfaz:
+        - anadir_producto recibe la sucursal (con enrutar="ubicacion") y devuelve
+          en cuál quedó el producto.
+        - buscar_por_nombre devuelve pares (sucursal, Producto).
+        - No hay mostrar_todos (traería todas las filas de todas las sucursales);
+          los totales del stock se piden con valorizacion() y valorizacion_total().
+        Reparto:
+        - `rutas` es {nombre de sucursal: archivo .db}. Con enrutar="id" su orden
+          define el reparto (id % n), así que no debe cambiar ni crecer sin
+          redistribuir los productos.
+        - Con enrutar="ubicacion" la sucursal se indica en anadir_producto; las
+          demás operaciones la buscan en un mapa id -> sucursal que se llena al
+          arrancar y se mantiene con cada alta y baja, así que solo tocan su
+          sucursal. Las altas se serializan entre sí para que un ID no se repita
+          en dos sucursales. Las bases solo deben modificarse a través de esta
+          fachada mientras esté abierta.
+        - Los nombres son únicos dentro de cada sucursal, no entre sucursales.
+        - actualizar_cantidades escribe una transacción por sucursal: no es atómico
+          entre sucursales.
+        """
+    
+        def __init__(
+            self,
+            rutas: Dict[str, str],
+            enrutar: str = "id",
+            paralelo: str = "hilos",
+            max_workers: Optional[int] = None,
+            limite_cambios: Optional[int] = None,
+            archivos_cache: bool = False,
+        ) -> None:
+            if not rutas:
+                raise ValueError("Hace falta al menos una sucursal.")
+            if enrutar not in ENRUTAMIENTOS:
+                raise ValueError(f"enrutar debe ser uno de {ENRUTAMIENTOS}.")
+            if paralelo not in PARALELISMOS:
+                raise ValueError(f"paralelo debe ser uno de {PARALELISMOS}.")
+            self.enrutar = enrutar
+            self.nombres: List[str] = list(rutas)
+            self._sucursales: Dict[str, Sucursal] = {
+                nombre: Sucursal(
+                    nombre, ruta, limite_cambios=limite_cambios,
+                    archivo_cache=ruta + ".cache" if archivos_cache else None,
+                )
+                for nombre, ruta in rutas.items()
+            }
+            try:
+                for sucursal in self._sucursales.values():
+                    sucursal.esperar()
+            except Exception:
+                self.cerrar()
+                raise
+            # Pool para las consultas que recorren todas las sucursales
+            workers = max_workers or len(self.nombres)
+            if paralelo == "procesos":
+                self._consultas: Executor = ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1))
+            else:
+                self._consultas = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sucursales-consulta")
+            self._altas = threading.Lock()
+            # Con enrutar="ubicacion": en qué sucursal está cada producto
+            self._ubicaciones: Dict[int, str] = {}
+            if enrutar == "ubicacion":
+                for nombre, filas in self._en_todas(_consultar, "SELECT id FROM productos;").items():
+                    self._ubicaciones.update(dict.fromkeys((fila[0] for fila in filas), nombre))
+    
+        # --- Enrutamiento ---
+        def sucursal_de(self, product_id: int) -> Optional[str]:
+            """Sucursal del producto (con enrutar="ubicacion", None si no existe)."""
+            if self.enrutar == "id":
+                return self.nombres[product_id % len(self.nombres)]
+            return self._ubicaciones.get(product_id)
+    
+        def _en_sucursal(self, product_id: int, metodo: str, *args):
+            nombre = self.sucursal_de(product_id)
+            if nombre is None:
+                return None
+            return self._sucursales[nombre].ejecutar(metodo, product_id, *args).result()
+    
+        # --- Escrituras (una sola sucursal) ---
+        def anadir_producto(self, producto: Producto, sucursal: Optional[str] = None) -> str:
+            """Da de alta el producto y devuelve la sucursal en la que quedó."""
+            if self.enrutar == "id":
+                destino = self.sucursal_de(producto.id)
+                if sucursal is not None and sucursal != destino:
+                    raise ValueError(f"El producto {producto.id} corresponde a la sucursal '{destino}'.")
+                self._sucursales[destino].ejecutar("anadir_producto", producto).result()
+                return destino
+            if sucursal not in self._sucursales:
+                raise ValueError(f"Sucursal desconocida: {sucursal!r}.")
+            with self._altas:
+                if self.sucursal_de(producto.id) is not None:
+                    raise ValueError(f"Ya existe un producto con ID {producto.id}.")
+                self._sucursales[sucursal].ejecutar("anadir_producto", producto).result()
+                self._ubicaciones[producto.id] = sucursal
+            return sucursal
+    
+        def eliminar_por_id(self, product_id: int) -> bool:
+            eliminado = bool(self._en_sucursal(product_id, "eliminar_por_id"))
+            if eliminado and self.enrutar == "ubicacion":
+                self._ubicaciones.pop(product_id, None)
+            return eliminado
+    
+        def actualizar_cantidad(self, product_id: int, nueva_cantidad: int) -> bool:
+            return bool(self._en_sucursal(product_id, "actualizar_cantidad", nueva_cantidad))
+    
+        def actualizar_precio(self, product_id: int, nuevo_precio: float) -> bool:
+            return bool(self._en_sucursal(product_id, "actualizar_precio", nuevo_precio))
+    
+        def actualizar_cantidades(self, cambios: Dict[int, int]) -> None:
+            """Agrupa los cambios por sucursal y los escribe en paralelo (una transacción por sucursal)."""
+            por_sucursal: Dict[str, Dict[int, int]] = {}
+            for product_id, nueva_cantidad in cambios.items():
+                nombre = self.sucursal_de(product_id)
+                if nombre is None:
+                    raise KeyError(f"No existe un producto con ID {product_id}.")
+                por_sucursal.setdefault(nombre, {})[product_id] = nueva_cantidad
+            futuros = [self._sucursales[n].ejecutar("actualizar_cantidades", c) for n, c in por_sucursal.items()]
+            for futuro in futuros:
+                futuro.result()
+    
+        # --- Lecturas ---
+        def obtener_por_id(self, product_id: int) -> Optional[Producto]:
+            return self._en_sucursal(product_id, "obtener_por_id")
+    
+        def _en_todas(self, funcion: Callable, *args) -> Dict[str, List[Tuple]]:
+            futuros = {
+                nombre: self._consultas.submit(funcion, s.ruta_db, *args) for nombre, s in self._sucursales.items()
+            }
+            return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+    
+        def buscar_por_nombre(self, termino: str) -> List[Tuple[str, Producto]]:
+            """(sucursal, producto) de todas las sucursales, ordenados por nombre."""
+            filas = self._en_todas(_consultar, SQL_BUSCAR, (f"%{termino.lower()}%",))
+            # Cada sucursal ya viene ordenada por nombre: basta con intercalarlas
+            listas = [[(nombre, Producto(*fila)) for fila in resultado] for nombre, resultado in filas.items()]
+            return list(heapq.merge(*listas, key=lambda par: par[1].nombre))
+    
+        def valorizacion(self) -> Dict[str, Valorizacion]:
+            """Productos, unidades y valor (cantidad * precio) de cada sucursal."""
+            return {nombre: Valorizacion(*filas[0]) for nombre, filas in self._en_todas(_consultar, SQL_VALORIZAR).items()}
+    
+        def valorizacion_total(self) -> Valorizacion:
+            return sum(self.valorizacion().values(), Valorizacion(0, 0, 0.0))
+    
+        def cerrar(self) -> None:
+            if hasattr(self, "_consultas"):
+                self._consultas.shutdown()
+            cierres = [threading.Thread(target=s.cerrar) for s in self._sucursales.values()]
+            for hilo in cierres:
+                hilo.start()
+            for hilo in cierres:
+                hilo.join()
+    
+    
+    # ----------------------------
+    # Comparación: un archivo frente a N sucursales
+    # ----------------------------
+    def _poblar(rutas: Dict[str, str], filas: int) -> None:
+        """Reparte `filas` productos por id % n entre las bases (vacías) de `rutas`."""
+        nombres = list(rutas)
+        for ruta in rutas.values():
+            Inventario(ruta, wal=True).cerrar()  # crea las tablas
+        conexiones = {nombre: sqlite3.connect(ruta) for nombre, ruta in rutas.items()}
+        try:
+            for nombre, con in conexiones.items():
+                indice = nombres.index(nombre)
+                with con:
+                    con.executemany(
+                        "INSERT INTO productos (id, nombre, cantidad, precio) VALUES (?, ?, ?, ?);",
+                        ((i, f"Producto {i}", i % 500, round(1 + (i % 997) * 0.25, 2))
+                         for i in range(1, filas + 1) if i % len(nombres) == indice),
+                    )
+        finally:
+            for con in conexiones.values():
+                con.close()
+    
+    
+    def _cronometrar(funcion: Callable, repeticiones: int) -> float:
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        return (time.perf_counter() - inicio) / repeticiones * 1000
+    
+    
+    def _escrituras_por_segundo(inv: InventarioSucursales, clientes: int, escrituras: int, filas: int) -> float:
+        def cliente(n: int) -> None:
+            azar = random.Random(n)
+            for _ in range(escrituras):
+                inv.actualizar_cantidad(azar.randint(1, filas), azar.randint(0, 500))
+    
+        hilos = [threading.Thread(target=cliente, args=(n,)) for n in range(clientes)]
+        inicio = time.perf_counter()
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        return clientes * escrituras / (time.perf_counter() - inicio)
+    
+    
+    def comparar(sucursales: int, filas: int, clientes: int, escrituras: int, repeticiones: int = 5) -> None:
+        carpeta = tempfile.mkdtemp(prefix="sucursales_")
+        una = {"unica": os.path.join(carpeta, "unica.db")}
+        varias = {f"s{i}": os.path.join(carpeta, f"s{i}.db") for i in range(sucursales)}
+        _poblar(una, filas)
+        _poblar(varias, filas)
+        print(f"{filas} productos en 1 archivo y en {sucursales} sucursales ({carpeta})")
+    
+        configuraciones = [
+            ("1 archivo", una, "hilos"),
+            (f"{sucursales} sucursales, hilos", varias, "hilos"),
+            (f"{sucursales} sucursales, procesos", varias, "procesos"),
+        ]
+        print(f"\\n{'':<26} {'búsqueda':>10} {'valorización':>13} {'escrituras/s':>13}")
+        for titulo, rutas, paralelo in configuraciones:
+            inv = InventarioSucursales(rutas, paralelo=paralelo)
+            try:
+                inv.valorizacion()  # arranca el pool (procesos) antes de medir
+                busqueda = _cronometrar(lambda: inv.buscar_por_nombre("producto 12"), repeticiones)
+                valor = _cronometrar(inv.valorizacion_total, repeticiones)
+                por_segundo = _escrituras_por_segundo(inv, clientes, escrituras, filas)
+            finally:
+                inv.cerrar()
+            print(f"{titulo:<26} {busqueda:>7.1f} ms {valor:>10.1f} ms {por_segundo:>13.0f}")
+    
+    
+    def main() -> None:
+        parser = argparse.ArgumentParser(description="Compara un inventario en un archivo con uno repartido en sucursales.")
+        parser.add_argument("--sucursales", type=int, default=4)
+        parser.add_argument("--filas", type=int, default=200_000)
+        parser.add_argument("--clientes", type=int, default=8, help="hilos que escriben a la vez")
+        parser.add_argument("--escrituras", type=int, default=250, help="actualizaciones por cliente")
+        args = parser.parse_args()
+        comparar(args.sucursales, args.filas, args.clientes, args.escrituras)
+    
+    
+    if __name__ == "__main__":
+        main()
+''')
+
+pruebas = dedent('''
+    """
+    Pruebas del registro de cambios y del archivo de caché de Inventario, de la
+    validación de la API HTTP y del enrutamiento de InventarioSucursales.
+    
+        python -m pytest test_inventario.py
+    """
+    import http.client
+    import json
+    import sqlite3
+    import threading
+    
+    import pytest
+    
+    from inventario_api import ServidorInventario
+    from inventario_sqlite import CambiosCompactados, Inventario, Producto, ProductosMapeados
+    from inventario_sucursales import InventarioSucursales
+    
+    
+    def _poblar(inv: Inventario, desde: int, hasta: int) -> None:
+        for i in range(desde, hasta + 1):
+            inv.anadir_producto(Producto(i, f"Producto {i}", i, 1.5))
+    
+    
+    def test_seq_no_retrocede_al_reabrir_tras_compactar(tmp_path):
+        db = str(tmp_path / "inventario.db")
+        inv = Inventario(db)
+        _poblar(inv, 1, 5)
+        assert inv.compactar() == 5
+        inv.cerrar()
+    
+        inv = Inventario(db)
+        assert inv.ultima_secuencia() == 5
+        assert inv.compactar() == 5
+        with pytest.raises(CambiosCompactados):
+            inv.cambios_desde(2)
+        inv.anadir_producto(Producto(6, "Producto 6", 1, 1.0))
+        assert [c.seq for c in inv.cambios_desde(5)] == [6]
+        inv.cerrar()
+    
+    
+    def test_archivo_cache_se_mapea_al_reiniciar_tras_compactar(tmp_path):
+        db, cache = str(tmp_path / "inventario.db"), str(tmp_path / "inventario.cache")
+        inv = Inventario(db, limite_cambios=3, archivo_cache=cache)
+        _poblar(inv, 1, 5)
+        inv.cerrar()
+        for reinicio in range(3):
+            inv = Inventario(db, limite_cambios=3, archivo_cache=cache)
+            assert isinstance(inv._cache, ProductosMapeados), f"reinicio {reinicio} cargó desde SQLite"
+            assert inv.obtener_por_id(5).cantidad == 5 + reinicio
+            # Más cambios que limite_cambios: fuerza una compactación antes de cerrar
+            for _ in range(4):
+                inv.actualizar_cantidad(5, inv.obtener_por_id(5).cantidad)
+            inv.actualizar_cantidad(5, 6 + reinicio)
+            inv.cerrar()
+    
+    
+    def test_archivo_cache_pendiente_aplica_cambios_de_otro_proceso(tmp_path):
+        db, cache = str(tmp_path / "inventario.db"), str(tmp_path / "inventario.cache")
+        inv = Inventario(db, archivo_cache=cache)
+        _poblar(inv, 1, 3)
+        inv.cerrar()
+        otro = Inventario(db)
+        otro.actualizar_precio(2, 9.0)
+        otro.eliminar_por_id(3)
+        otro.cerrar()
+    
+        inv = Inventario(db, archivo_cache=cache)
+        assert isinstance(inv._cache, ProductosMapeados)
+        assert inv.obtener_por_id(2).precio == 9.0
+        assert inv.obtener_por_id(3) is None
+        assert [p.id for p in inv.mostrar_todos()] == [1, 2]
+        inv.cerrar()
+    
+    
+    def test_archivo_cache_ve_escrituras_fuera_de_inventario(tmp_path):
+        db, cache = str(tmp_path / "inventario.db"), str(tmp_path / "inventario.cache")
+        inv = Inventario(db, archivo_cache=cache)
+        _poblar(inv, 1, 3)
+        inv.cerrar()
+        # Escrituras directas con sqlite3: los triggers las anotan en el registro
+        con = sqlite3.connect(db)
+        with con:
+            con.execute("UPDATE productos SET cantidad = 99 WHERE id = 1;")
+            con.execute("UPDATE productos SET nombre = 'Renombrado' WHERE id = 2;")
+            con.execute("DELETE FROM productos WHERE id = 3;")
+            con.execute("INSERT INTO productos (id, nombre, cantidad, precio) VALUES (4, 'Nuevo', 1, 2.0);")
+        con.close()
+    
+        for _ in range(2):  # el segundo arranque usa el archivo reescrito al cerrar
+            inv = Inventario(db, archivo_cache=cache)
+            assert isinstance(inv._cache, ProductosMapeados)
+            assert inv.obtener_por_id(1).cantidad == 99
+            assert inv.obtener_por_id(2).nombre == "Renombrado"
+            assert inv.obtener_por_id(3) is None
+            assert [p.id for p in inv.mostrar_todos()] == [1, 2, 4]
+            with pytest.raises(ValueError):
+                inv.anadir_producto(Producto(5, "renombrado", 1, 1.0))
+            inv.cerrar()
+    
+    
+    def test_archivo_cache_de_otra_base_se_descarta(tmp_path):
+        cache = str(tmp_path / "inventario.cache")
+        a = Inventario(str(tmp_path / "a.db"), archivo_cache=cache)
+        _poblar(a, 1, 3)
+        a.cerrar()
+        # Otra base con el mismo seq (3) no debe aceptar las filas de `a`
+        b = Inventario(str(tmp_path / "b.db"))
+        _poblar(b, 10, 12)
+        b.cerrar()
+    
+        b = Inventario(str(tmp_path / "b.db"), archivo_cache=cache)
+        assert isinstance(b._cache, dict)
+        assert [p.id for p in b.mostrar_todos()] == [10, 11, 12]
+        b.cerrar()
+    
+    
+    @pytest.fixture
+    def api(tmp_path):
+        servidor = ServidorInventario(str(tmp_path / "api.db"), lectores=1)
+        listo = threading.Event()
+        hilo = threading.Thread(target=servidor.servir_en_hilo, args=("127.0.0.1", 0, listo), daemon=True)
+        hilo.start()
+        assert listo.wait(5)
+    
+        def post(cuerpo) -> int:
+            con = http.client.HTTPConnection("127.0.0.1", servidor.puerto, timeout=5)
+            con.request("POST", "/productos", json.dumps(cuerpo), {"Content-Type": "application/json"})
+            estado = con.getresponse().status
+            con.close()
+            return estado
+    
+        yield post
+        servidor.detener()
+        hilo.join(5)
+        servidor.cerrar()
+    
+    
+    def test_api_crear_valida_tipos_y_conflictos(api):
+        valido = {"id": 1, "nombre": "Tornillo", "cantidad": 10, "precio": 0.5}
+        for campo, valor in [("nombre", None), ("nombre", 7), ("nombre", " "), ("id", True),
+                             ("cantidad", 1.9), ("cantidad", "3"), ("precio", False), ("precio", None)]:
+            assert api({**valido, campo: valor}) == 400, (campo, valor)
+        assert api({**valido, "cantidad": -1}) == 400
+        assert api({**valido, "precio": -0.5}) == 400
+        assert api({**valido, "precio": 2}) == 201
+        assert api(valido) == 409
+        assert api({**valido, "id": 2, "nombre": "TORNILLO"}) == 409
+    
+    
+    def _cantidad_en(ruta_db: str, product_id: int):
+        con = sqlite3.connect(ruta_db)
+        fila = con.execute("SELECT cantidad FROM productos WHERE id = ?;", (product_id,)).fetchone()
+        con.close()
+        return fila[0] if fila else None
+    
+    
+    def test_sucursales_por_ubicacion_escriben_solo_en_su_sucursal(tmp_path):
+        rutas = {"centro": str(tmp_path / "centro.db"), "norte": str(tmp_path / "norte.db")}
+        inv = InventarioSucursales(rutas, enrutar="ubicacion")
+        # IDs pares en "norte": con enrutar="id" irían a "centro"
+        assert inv.anadir_producto(Producto(2, "Martillo", 1, 10.0), "norte") == "norte"
+        assert inv.anadir_producto(Producto(3, "Clavo", 5, 0.1), "centro") == "centro"
+        with pytest.raises(ValueError):
+            inv.anadir_producto(Producto(2, "Otro", 1, 1.0), "centro")
+        assert inv.actualizar_cantidad(2, 7)
+        assert inv.obtener_por_id(2).cantidad == 7
+        assert [(s, p.id) for s, p in inv.buscar_por_nombre("")] == [("centro", 3), ("norte", 2)]
+        assert inv.eliminar_por_id(3)
+        assert inv.sucursal_de(3) is None and not inv.actualizar_cantidad(3, 1)
+        inv.cerrar()
+    
+        assert _cantidad_en(rutas["norte"], 2) == 7
+        assert _cantidad_en(rutas["centro"], 2) is None
+    
+    
+    def test_sucursales_mapa_de_ubicaciones_sobrevive_al_reinicio(tmp_path):
+        rutas = {"centro": str(tmp_path / "centro.db"), "norte": str(tmp_path / "norte.db")}
+        inv = InventarioSucursales(rutas, enrutar="ubicacion")
+        for i in range(1, 7):
+            inv.anadir_producto(Producto(i, f"Producto {i}", i, 1.0), "norte" if i <= 4 else "centro")
+        inv.cerrar()
+    
+        inv = InventarioSucursales(rutas, enrutar="ubicacion")
+        assert {i: inv.sucursal_de(i) for i in range(1, 8)} == {
+            1: "norte", 2: "norte", 3: "norte", 4: "norte", 5: "centro", 6: "centro", 7: None,
+        }
+        assert inv.actualizar_cantidad(1, 40)
+        with pytest.raises(ValueError):
+            inv.anadir_producto(Producto(5, "Repetido", 1, 1.0), "norte")
+        inv.cerrar()
+        assert _cantidad_en(rutas["norte"], 1) == 40
+        assert _cantidad_en(rutas["centro"], 1) is None
+''')
+
 with open('/mnt/data/inventario_sqlite.py', 'w', encoding='utf-8') as f:
     f.write(code)
 
 with open('/mnt/data/README.md', 'w', encoding='utf-8') as f:
     f.write(readme)
 
-'/mnt/data/inventario_sqlite.py y /mnt/data/README.md creados correctamente.'
+with open('/mnt/data/inventario_api.py', 'w', encoding='utf-8') as f:
+    f.write(api)
+
+with open('/mnt/data/bench_arranque.py', 'w', encoding='utf-8') as f:
+    f.write(bench)
+
+with open('/mnt/data/inventario_sucursales.py', 'w', encoding='utf-8') as f:
+    f.write(sucursales)
+
+with open('/mnt/data/test_inventario.py', 'w', encoding='utf-8') as f:
+    f.write(pruebas)
+
+'/mnt/data/inventario_sqlite.py, /mnt/data/inventario_api.py, /mnt/data/bench_arranque.py, /mnt/data/inventario_sucursales.py, /mnt/data/test_inventario.py y /mnt/data/README.md creados correctamente.'
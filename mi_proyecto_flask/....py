@@ -1,6 +1,11 @@
 from flask import Flask, render_template, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
 import os, json, csv
+# instrumentacion, estaticos y plantillas están en la raíz del repositorio:
+# arrancar con `python servidor.py "mi_proyecto_flask/....py" --modo dev`
+from estaticos import Estaticos
+from instrumentacion import Instrumentacion
+from plantillas import PrecargaPlantillas
 
 app = Flask(__name__)
 
@@ -15,6 +20,9 @@ os.makedirs(DB_DIR, exist_ok=True)
 app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(DB_DIR, "usuarios.db")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 db = SQLAlchemy(app)
+instrumentacion = Instrumentacion(app)
+Estaticos(app)
+PrecargaPlantillas(app)
 
 # --- Modelo de base de datos ---
 class Usuario(db.Model):
@@ -23,6 +31,7 @@ class Usuario(db.Model):
 
 with app.app_context():
     db.create_all()
+    instrumentacion.instrumentar_engine(db.engine)
 
 # -------------------------
 # Rutas de la aplicación
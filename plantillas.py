@@ -0,0 +1,91 @@
+"""
+Precompilación de plantillas Jinja con caché de bytecode en disco.
+
+Al arrancar se compilan todas las plantillas de la app (index.html,
+base.html, productos.html...) y el bytecode se guarda en disco. Un worker
+nuevo o un reinicio carga ese bytecode en lugar de volver a parsear cada
+plantilla; con `servidor.py --preload` los workers heredan además las
+plantillas ya compiladas en memoria del proceso master.
+
+Uso (antes de que nada use app.jinja_env):
+    app = Flask(__name__)
+    PrecargaPlantillas(app)
+
+Configuración (app.config o variable de entorno):
+    PLANTILLAS_CACHE_DIR   carpeta del bytecode (por defecto .jinja_cache junto a la app)
+    PLANTILLAS_PRECARGAR   True/False, compilar todo al arrancar (por defecto True)
+
+Si la carpeta no se puede crear o escribir (despliegue de solo lectura) se sigue sin
+caché en disco: las plantillas se precompilan igual, solo en memoria.
+"""
+from __future__ import annotations
+import logging
+import os
+import time
+from typing import List, Optional
+
+from flask import Flask
+from jinja2 import FileSystemBytecodeCache, TemplateError
+
+from instrumentacion import leer_bool
+
+logger = logging.getLogger("plantillas")
+
+EXTENSIONES = ("html", "htm", "xml", "txt", "j2")
+
+
+class PrecargaPlantillas:
+    def __init__(self, app: Optional[Flask] = None) -> None:
+        self.compiladas: List[str] = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        def config(clave: str, defecto):
+            return app.config.get(clave, os.environ.get(clave, defecto))
+
+        carpeta = config("PLANTILLAS_CACHE_DIR", os.path.join(app.root_path, ".jinja_cache"))
+        try:
+            os.makedirs(carpeta, exist_ok=True)
+            if not os.access(carpeta, os.W_OK):
+                # Jinja fallaría al guardar el bytecode de cada plantilla
+                raise PermissionError(f"sin permiso de escritura en {carpeta}")
+        except OSError as e:
+            logger.warning("Sin caché de bytecode: no se pudo usar %s (%s)", carpeta, e)
+        else:
+            self._usar_cache(app, FileSystemBytecodeCache(carpeta))
+        app.extensions["plantillas"] = self
+        if leer_bool(config("PLANTILLAS_PRECARGAR", True)):
+            self.precargar(app)
+
+    @staticmethod
+    def _usar_cache(app: Flask, cache: FileSystemBytecodeCache) -> None:
+        # jinja_options solo se aplica al crear app.jinja_env (la primera vez que se accede)
+        if "jinja_env" not in vars(app):
+            app.jinja_options = {**app.jinja_options, "bytecode_cache": cache}
+            return
+        logger.warning(
+            "app.jinja_env ya existía al iniciar PrecargaPlantillas (¿otra extensión la usó antes?): "
+            "la caché de bytecode se asigna al entorno ya creado; inicializa PrecargaPlantillas antes."
+        )
+        app.jinja_env.bytecode_cache = cache
+
+    def precargar(self, app: Flask) -> List[str]:
+        """Compila todas las plantillas; devuelve sus nombres."""
+        inicio = time.perf_counter()
+        env = app.jinja_env
+        nombres = env.list_templates(extensions=EXTENSIONES)
+        # Que la caché en memoria no expulse plantillas precargadas
+        if env.cache is not None and len(nombres) > env.cache.capacity:
+            env.cache.capacity = len(nombres)
+        self.compiladas = []
+        for nombre in nombres:
+            try:
+                env.get_template(nombre)
+                self.compiladas.append(nombre)
+            except TemplateError as e:
+                logger.warning("No se pudo precompilar %s: %s", nombre, e)
+        logger.info(
+            "%d plantillas precompiladas en %.1f ms", len(self.compiladas), (time.perf_counter() - inicio) * 1000
+        )
+        return self.compiladas
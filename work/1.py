@@ -1,10 +1,19 @@
 from flask import Flask, render_template, request, redirect, url_for
 import mysql.connector
+# instrumentacion, estaticos y plantillas están en la raíz del repositorio:
+# arrancar con `python servidor.py work/1.py --modo dev`
+from estaticos import Estaticos
+from instrumentacion import Instrumentacion
+from plantillas import PrecargaPlantillas
 
 app = Flask(__name__)
+instrumentacion = Instrumentacion(app)
+Estaticos(app)
+PrecargaPlantillas(app)
 
 
 # Conexión con MySQL
+@instrumentacion.envolver_conexion
 def conexionBD():
     return mysql.connector.connect(
         host="localhost",